@@ -0,0 +1,198 @@
+import operator
+
+import numpy as np
+
+OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le
+}
+
+# Rules in the same group behave like an if/elif chain: only the first one that fires is reported.
+# window is the number of forecast days to look at (None means the whole horizon).
+WEATHER_RULES = [
+    {
+        'name': 'high_temperature', 'group': 'temperature', 'metric': 'Temperature_C',
+        'operator': '>', 'threshold': 35, 'window': None, 'severity': 'danger',
+        'title': '🔥 High Temperature Alert',
+        'message': 'Temperatures expected to exceed {threshold:g}°C. Take precautions against heat stress for crops and workers. Consider additional irrigation.'
+    },
+    {
+        'name': 'low_temperature', 'group': 'temperature', 'metric': 'Temperature_C',
+        'operator': '<', 'threshold': 10, 'window': None, 'severity': 'info',
+        'title': '❄️ Low Temperature Alert',
+        'message': 'Temperatures expected to drop below {threshold:g}°C. Protect sensitive crops from cold damage. Frost risk for susceptible plants.'
+    },
+    {
+        'name': 'high_humidity', 'group': 'humidity', 'metric': 'Humidity_%',
+        'operator': '>', 'threshold': 85, 'window': None, 'severity': 'warning',
+        'title': '💧 High Humidity Alert',
+        'message': 'Humidity levels expected to exceed {threshold:g}%. High risk of fungal diseases in crops. Consider preventative fungicide application.'
+    },
+    {
+        'name': 'low_humidity', 'group': 'humidity', 'metric': 'Humidity_%',
+        'operator': '<', 'threshold': 30, 'window': None, 'severity': 'warning',
+        'title': '🏜️ Low Humidity Alert',
+        'message': 'Humidity levels expected to drop below {threshold:g}%. Increase irrigation frequency to prevent plant stress and dehydration.'
+    },
+    {
+        'name': 'high_wind', 'group': 'wind', 'metric': 'Wind_Speed_kmph',
+        'operator': '>', 'threshold': 25, 'window': None, 'severity': 'danger',
+        'title': '💨 High Wind Alert',
+        'message': 'Wind speeds expected to exceed {threshold:g} km/h. Secure loose items and protect sensitive crops. Avoid spraying operations during high winds.'
+    },
+    {
+        'name': 'high_uv', 'group': 'uv', 'metric': 'UV_Index',
+        'operator': '>', 'threshold': 8, 'window': None, 'severity': 'warning',
+        'title': '☀️ High UV Alert',
+        'message': 'UV Index expected to exceed {threshold:g}. Ensure adequate protection for outdoor workers and consider shade for sensitive seedlings.'
+    },
+    {
+        'name': 'high_pressure', 'group': 'pressure', 'metric': 'Atmospheric_Pressure_hPa',
+        'operator': '>', 'threshold': 1025, 'window': None, 'severity': 'info',
+        'title': '🌤️ High Pressure System',
+        'message': 'Clear weather conditions likely. Good for outdoor activities and harvesting operations. Plan field work during this period.'
+    },
+    {
+        'name': 'low_pressure', 'group': 'pressure', 'metric': 'Atmospheric_Pressure_hPa',
+        'operator': '<', 'threshold': 995, 'window': None, 'severity': 'warning',
+        'title': '🌧️ Low Pressure System',
+        'message': 'Possibility of unstable weather conditions. Monitor for rainfall and potential storms. Consider postponing sensitive operations.'
+    },
+    {
+        'name': 'heavy_rain', 'group': 'rain', 'metric': 'Rain_Probability_%',
+        'operator': '>', 'threshold': 70, 'window': None, 'severity': 'danger',
+        'title': '🌊 Heavy Rain Alert',
+        'message': 'High probability of significant rainfall. Prepare drainage systems and check erosion controls. Delay fertilizer applications.'
+    },
+    {
+        'name': 'moderate_rain', 'group': 'rain', 'metric': 'Rain_Probability_%',
+        'operator': '>', 'threshold': 40, 'window': None, 'severity': 'warning',
+        'title': '🌧️ Moderate Rain Alert',
+        'message': 'Moderate chance of rainfall. Plan activities accordingly and be prepared to adjust irrigation schedules.'
+    }
+]
+
+SOIL_METRICS = ['ph', 'nitrogen', 'crop_area_excess']
+
+SOIL_RULES = [
+    {
+        'name': 'low_ph', 'group': 'ph', 'metric': 'ph',
+        'operator': '<', 'threshold': 6.0, 'severity': 'danger',
+        'title': 'Low pH Alert',
+        'message': 'Soil pH is {value:.1f}, which is below optimal range. Consider liming.'
+    },
+    {
+        'name': 'high_ph', 'group': 'ph', 'metric': 'ph',
+        'operator': '>', 'threshold': 7.5, 'severity': 'warning',
+        'title': 'High pH Alert',
+        'message': 'Soil pH is {value:.1f}, which is above optimal range. Consider adding sulfur.'
+    },
+    {
+        'name': 'low_nitrogen', 'group': 'nitrogen', 'metric': 'nitrogen',
+        'operator': '<', 'threshold': 20, 'severity': 'success',
+        'title': 'Low Nitrogen',
+        'message': 'Nitrogen levels are below optimal. Consider adding nitrogen-rich fertilizer.'
+    },
+    {
+        'name': 'overcrowding', 'group': 'crop_area', 'metric': 'crop_area_excess',
+        'operator': '>', 'threshold': 0, 'severity': 'info',
+        'title': 'Overcrowding Alert',
+        'message': 'Total crop area exceeds available land. Review crop spacing.'
+    }
+]
+
+
+def _fired_mask(rules, stats):
+    """Which rules fire for each row of stats (rows x rules), with if/elif groups applied."""
+    thresholds = np.array([rule['threshold'] for rule in rules], dtype=np.float64)
+    fired = np.zeros(stats.shape, dtype=bool)
+    with np.errstate(invalid='ignore'):
+        for name, compare in OPERATORS.items():
+            cols = np.array([rule['operator'] == name for rule in rules])
+            if cols.any():
+                fired[:, cols] = compare(stats[:, cols], thresholds[cols])
+    fired &= ~np.isnan(stats)
+
+    # Suppress a rule when an earlier rule of the same group already fired
+    groups = np.array([rule.get('group', rule['name']) for rule in rules])
+    for group in np.unique(groups):
+        cols = np.flatnonzero(groups == group)
+        if len(cols) > 1:
+            earlier = np.cumsum(fired[:, cols], axis=1) - fired[:, cols]
+            fired[:, cols] &= earlier == 0
+    return fired
+
+
+def _collect(rules, stats, fired):
+    """Structured alerts for every row, in rule order."""
+    results = [[] for _ in range(stats.shape[0])]
+    for row, col in zip(*np.nonzero(fired)):
+        rule = rules[col]
+        value = float(stats[row, col])
+        results[row].append({
+            'rule': rule['name'],
+            'metric': rule['metric'],
+            'severity': rule['severity'],
+            'title': rule['title'],
+            'message': rule['message'].format(value=value, threshold=rule['threshold']),
+            'value': value,
+            'threshold': rule['threshold']
+        })
+    return results
+
+
+def evaluate_weather(forecasts, metrics, rules=WEATHER_RULES):
+    """Evaluate weather rules against forecasts.
+
+    forecasts: array of shape (days, metrics) for one farm or (farms, days, metrics)
+    metrics: column name of each slice along the last axis
+    Returns a list of alerts for one farm, or one list per farm.
+    """
+    forecasts = np.asarray(forecasts, dtype=np.float64)
+    single = forecasts.ndim == 2
+    if single:
+        forecasts = forecasts[np.newaxis]
+    days = forecasts.shape[1]
+
+    rules = [rule for rule in rules if rule['metric'] in metrics]
+    if not rules:
+        return [] if single else [[] for _ in range(forecasts.shape[0])]
+
+    # Running max/min over the horizon so any window is a single lookup
+    running_max = np.fmax.accumulate(forecasts, axis=1)
+    running_min = np.fmin.accumulate(forecasts, axis=1)
+
+    metric_idx = np.array([metrics.index(rule['metric']) for rule in rules])
+    window_idx = np.array([min(rule.get('window') or days, days) - 1 for rule in rules])
+    upper = np.array([rule['operator'] in ('>', '>=') for rule in rules])
+
+    stats = np.where(
+        upper,
+        running_max[:, window_idx, metric_idx],
+        running_min[:, window_idx, metric_idx]
+    )
+    alerts = _collect(rules, stats, _fired_mask(rules, stats))
+    return alerts[0] if single else alerts
+
+
+def soil_metrics(soil_data, crop_data):
+    """Flatten a soil record and its crop allocation into SOIL_METRICS values."""
+    total_area = sum(crop.get('acres_allocated', 0) for crop in crop_data.get('crops', []))
+    return {
+        'ph': soil_data.get('ph', 0),
+        'nitrogen': soil_data.get('nitrogen', 0),
+        'crop_area_excess': total_area - crop_data.get('total_acres', 0)
+    }
+
+
+def evaluate_soil(records, rules=SOIL_RULES):
+    """Evaluate soil rules for many farms at once; records are dicts of SOIL_METRICS values."""
+    if not records:
+        return []
+    stats = np.array([
+        [record.get(rule['metric'], np.nan) for rule in rules]
+        for record in records
+    ], dtype=np.float64)
+    return _collect(rules, stats, _fired_mask(rules, stats))
@@ -4,7 +4,6 @@ import base64
 import folium
 from streamlit_folium import folium_static
 import requests
-import pickle
 from PIL import Image
 import io
 import pandas as pd
@@ -12,15 +11,19 @@ import plotly.express as px
 from auth import get_logged_in_user, get_mongo_client, login_user, register_user, logout
 import time
 from update import get_soil_record, update_soil_record, format_soil_data_for_update
-from prophet import Prophet
 import numpy as np
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import json
-from disease import analyze_crop_disease, get_weather_forecast_averages
-import os
+from disease import analyze_crop_disease, get_weather_forecast_averages, predict_images
 from database import get_soil_parameters
+from recommendations import SECTIONS, parse_sections
 from model import CropProfitAnalyzer
+import model_registry
+import forecast_registry
+from forecast_jobs import get_forecast_job, start_forecast_job
+from alerts import evaluate_soil, evaluate_weather, soil_metrics
+from weather_data import data_file, list_locations, load_weather_frame
 
 
 st.set_page_config(
@@ -797,6 +800,13 @@ def home_page():
         </div>
     """, unsafe_allow_html=True)
 
+def render_recommendation_section(placeholder, title, body):
+    with placeholder.container():
+        st.markdown('<div class="recommendation-box">', unsafe_allow_html=True)
+        st.markdown(f'<div class="section-title">{title}</div>', unsafe_allow_html=True)
+        st.write(body)
+        st.markdown('</div>', unsafe_allow_html=True)
+
 def disease_detection_page():
     st.markdown("""
     <style>
@@ -987,8 +997,16 @@ def disease_detection_page():
             <h3 style="color: #186a3b; margin-bottom: 1rem;">Upload Plant Image</h3>
         """, unsafe_allow_html=True)
        
+        # Single image with recommendations, or many images classified in one batch
+        mode = st.radio("Mode", ["Single image", "Batch (many images)"], horizontal=True)
+        
         # File uploader
-        uploaded_file = st.file_uploader("Choose an image...", type=["jpg", "jpeg", "png"])
+        if mode == "Single image":
+            uploaded_file = st.file_uploader("Choose an image...", type=["jpg", "jpeg", "png"])
+            uploaded_files = []
+        else:
+            uploaded_files = st.file_uploader("Choose images...", type=["jpg", "jpeg", "png"], accept_multiple_files=True)
+            uploaded_file = None
         
         # Single Analyze button that will trigger the analysis
         analyze_clicked = st.button("Analyze", use_container_width=True)
@@ -1001,36 +1019,47 @@ def disease_detection_page():
             <h3 style="color: #186a3b; margin-bottom: 1rem;">Results</h3>
         """, unsafe_allow_html=True)
 
-        if uploaded_file is not None and analyze_clicked:
+        if uploaded_files and analyze_clicked:
+            with st.spinner(f"Classifying {len(uploaded_files)} images..."):
+                try:
+                    results = predict_images(uploaded_files)
+                    table = pd.DataFrame({
+                        'Image': [uploaded.name for uploaded in uploaded_files],
+                        'Detected Disease': [result['disease'] or '-' for result in results],
+                        'Confidence': [f"{result['confidence']:.1%}" if result['confidence'] is not None else '' for result in results],
+                        'Cached': ['yes' if result['cached'] else '' for result in results],
+                        'Error': [result['error'] or '' for result in results]
+                    })
+                    st.dataframe(table, use_container_width=True, hide_index=True)
+                   
+                    detected = table[table['Detected Disease'] != '-']['Detected Disease'].value_counts()
+                    if not detected.empty:
+                        st.markdown('<div class="section-title">Summary</div>', unsafe_allow_html=True)
+                        st.bar_chart(detected)
+                   
+                    st.download_button(
+                        "Download results (CSV)",
+                        table.to_csv(index=False),
+                        file_name="disease_results.csv",
+                        mime="text/csv",
+                        use_container_width=True
+                    )
+                except Exception as e:
+                    st.error(f"Error analyzing images: {str(e)}")
+        elif uploaded_file is not None and analyze_clicked:
             with st.spinner("Analyzing image..."):
-                temp_path = "temp_image.jpg"
-                with open(temp_path, "wb") as f:
-                    f.write(uploaded_file.getvalue())
-               
                 try:
-                    # Get user's soil parameters from MongoDB
+                    # The user's soil parameters are fetched from MongoDB alongside the image and weather stages
                     user_email = st.session_state.get('email')  # Get user email from session
-                    soil_params = get_soil_parameters(user_email)
-                    
-                    if not soil_params:
-                        st.warning("No soil parameters found. Please update your soil parameters in the Soil Analysis section.")
-                        soil_params = {
-                            "soil_type": "sandy",
-                            "nitrogen": 20,
-                            "phosphorus": 40,
-                            "potassium": 60,
-                            "ph": 6.5
-                        }
-                    
-                    # Use the user's soil parameters for analysis
                     results = analyze_crop_disease(
-                        temp_path,
-                        soil_params["soil_type"],
-                        soil_params["nitrogen"],
-                        soil_params["phosphorus"],
-                        soil_params["potassium"],
-                        soil_params["ph"]
+                        uploaded_file.getvalue(),
+                        "sandy", 20, 40, 60, 6.5,
+                        soil_loader=lambda: get_soil_parameters(user_email),
+                        stream=True
                     )
+                    
+                    if not results['soil_found']:
+                        st.warning("No soil parameters found. Please update your soil parameters in the Soil Analysis section.")
                    
                     st.markdown('<div class="result-box">', unsafe_allow_html=True)
                     st.markdown(f'<div class="disease-title">Detected Disease: {results["disease"]}</div>', unsafe_allow_html=True)
@@ -1064,31 +1093,32 @@ def disease_detection_page():
                    
                     st.markdown('</div>', unsafe_allow_html=True)
                    
-                    sections = results['recommendations'].split('\n\n')
-                    for section in sections:
-                        if "Fertilizer" in section or "fertilizer" in section:
-                            st.markdown('<div class="recommendation-box">', unsafe_allow_html=True)
-                            st.markdown('<div class="section-title">Fertilizer Recommendations</div>', unsafe_allow_html=True)
-                            st.write(section.replace("1. Fertilizer/Manure Recommendations:", "").strip())
-                            st.markdown('</div>', unsafe_allow_html=True)
-                       
-                        elif "Outbreak" in section or "outbreak" in section:
-                            st.markdown('<div class="recommendation-box">', unsafe_allow_html=True)
-                            st.markdown('<div class="section-title">Outbreak Analysis</div>', unsafe_allow_html=True)
-                            st.write(section.replace("2. Outbreak Analysis:", "").strip())
-                            st.markdown('</div>', unsafe_allow_html=True)
-                       
-                        elif "Remedies" in section or "remedies" in section:
-                            st.markdown('<div class="recommendation-box">', unsafe_allow_html=True)
-                            st.markdown('<div class="section-title">Recommended Remedies</div>', unsafe_allow_html=True)
-                            st.write(section.replace("3. Remedies:", "").strip())
-                            st.markdown('</div>', unsafe_allow_html=True)
+                    # Render each section as soon as its text starts arriving
+                    placeholders = {key: st.empty() for key in SECTIONS}
+                    shown = {}
+                    text = ''
+                    for chunk in results['recommendations']:
+                        text += chunk
+                        for key, body in parse_sections(text, final=False).items():
+                            if shown.get(key) != body:
+                                render_recommendation_section(placeholders[key], SECTIONS[key], body)
+                                shown[key] = body
+                    for key, body in parse_sections(text).items():
+                        if shown.get(key) != body:
+                            render_recommendation_section(placeholders[key], SECTIONS[key], body)
+                   
+                    timings = results['timings']
+                    st.caption(
+                        f"Image {timings['image']:.2f}s · Weather {timings['weather']:.2f}s · Soil {timings['soil']:.2f}s · "
+                        f"First text {timings.get('first_text', timings['total']):.2f}s · "
+                        f"Recommendations {timings['recommendations']:.2f}s · Total {timings['total']:.2f}s"
+                    )
+                    source = results['recommendation_source']
+                    if source.get('source', '').endswith('rules'):
+                        st.info(f"Some or all recommendations come from the built-in rules because the AI service was unavailable ({source['reason']}).")
                    
                 except Exception as e:
                     st.error(f"Error analyzing image: {str(e)}")
-                finally:
-                    if os.path.exists(temp_path):
-                        os.remove(temp_path)
         else:
             st.markdown("""
                 <div style="height: 200px; display: flex; align-items: center; justify-content: center; border: 1px dashed #ccc; border-radius: 5px;">
@@ -1338,19 +1368,7 @@ def soil_analysis_page():
         </div>
     </div>
     """, unsafe_allow_html=True)
-def load_model(model_path):
-    """Load the model with compatibility handling"""
-    try:
-        with open(model_path, 'rb') as file:
-            model_data = pickle.load(file)
-            
-            # If model is a dictionary (newer format)
-            if isinstance(model_data, dict):
-                return model_data['model']
-            return model_data
-    except Exception as e:
-        st.error(f"Error loading model: {str(e)}")
-        return None
+MODEL_FILE = 'random_forest_classifier.pkl'
 
 def best_crop_page():
     user_data = get_logged_in_user()
@@ -1413,7 +1431,7 @@ def best_crop_page():
 
     # Get weather forecast
     try:
-        weather_forecast = get_weather_forecast_averages()
+        weather_forecast = get_weather_forecast_averages(days=90)
         
         st.markdown("""
         <div class="dashboard-card">
@@ -1438,11 +1456,8 @@ def best_crop_page():
 
     if st.button("Get Crop Recommendations", use_container_width=True):
         try:
-            # Load and verify model
-            model = load_model('random_forest_classifier.pkl')
-            if model is None:
-                st.error("Failed to load the crop prediction model")
-                return
+            # Loaded once per process, checksum-verified and reloaded when the file changes
+            model = CropProfitAnalyzer.load_model(MODEL_FILE)
             
             # Prepare input values as numpy array
             input_values = np.array([
@@ -1510,6 +1525,13 @@ def best_crop_page():
 
                 st.plotly_chart(fig, use_container_width=True)
 
+                info = model_registry.model_info().get(MODEL_FILE)
+                if info:
+                    st.caption(
+                        f"Model {info['sha256'][:12]}{' (verified)' if info['verified'] else ''} · v{info['version']} · "
+                        f"loaded in {info['load_seconds']:.2f}s · {info['memory_mb']:.1f} MB"
+                    )
+
                 st.markdown("</div>", unsafe_allow_html=True)
                 st.markdown("""
                     <style>
@@ -2002,49 +2024,26 @@ def dashboard_page():
     </style>
     """, unsafe_allow_html=True)
 
+# Banner colours for each alert severity
+ALERT_COLORS = {
+    'danger': {'color': '#FFEBEE', 'border': '#D32F2F'},
+    'warning': {'color': '#FFF8E1', 'border': '#FFA000'},
+    'info': {'color': '#E3F2FD', 'border': '#1976D2'},
+    'success': {'color': '#E8F5E9', 'border': '#388E3C'}
+}
+
 def generate_alerts(soil_data, crop_data):
-    alerts = []
-    
     if not soil_data or not crop_data:
-        return alerts
-
-    # Soil pH alerts
-    ph = soil_data.get('ph', 0)
-    if ph < 6.0:
-        alerts.append({
-            'title': 'Low pH Alert',
-            'message': f'Soil pH is {ph:.1f}, which is below optimal range. Consider liming.',
-            'color': '#FFEBEE',
-            'border': '#D32F2F'
-        })
-    elif ph > 7.5:
-        alerts.append({
-            'title': 'High pH Alert',
-            'message': f'Soil pH is {ph:.1f}, which is above optimal range. Consider adding sulfur.',
-            'color': '#FFF8E1',
-            'border': '#FFA000'
-        })
+        return []
 
-    # Nutrient alerts
-    if soil_data.get('nitrogen', 0) < 20:
-        alerts.append({
-            'title': 'Low Nitrogen',
-            'message': 'Nitrogen levels are below optimal. Consider adding nitrogen-rich fertilizer.',
-            'color': '#E8F5E9',
-            'border': '#388E3C'
-        })
-
-    # Crop spacing alerts
-    total_area = sum(crop.get('acres_allocated', 0) for crop in crop_data.get('crops', []))
-    if total_area > crop_data.get('total_acres', 0):
-        alerts.append({
-            'title': 'Overcrowding Alert',
-            'message': 'Total crop area exceeds available land. Review crop spacing.',
-            'color': '#E3F2FD',
-            'border': '#1976D2'
-        })
+    alerts = evaluate_soil([soil_metrics(soil_data, crop_data)])[0]
+    return [
+        {'title': alert['title'], 'message': alert['message'], **ALERT_COLORS[alert['severity']]}
+        for alert in alerts
+    ]
 
-    return alerts
+# How often the weather page checks a running forecast job
+FORECAST_POLL_SECONDS = 0.5
 
 def weather_forecast_page():
     # Add CSS styles in the head
@@ -2254,13 +2253,17 @@ def weather_forecast_page():
     st.markdown('<h1 class="main-header">Weather Forecast</h1>', unsafe_allow_html=True)
     st.markdown('<p class="sub-header">View detailed weather predictions for your location</p>', unsafe_allow_html=True)
    
-    # Load data
-    file_path = 'final_dataset.csv'
-    df = pd.read_csv(file_path, parse_dates=['Date'])
+    # Farm location, when histories for more than the main dataset are available
+    locations = list_locations()
+    location = None
+    if locations:
+        location_label = st.selectbox("Farm location", ["Main farm"] + locations)
+        location = None if location_label == "Main farm" else location_label
    
-    # Set Date as index
-    if 'Date' in df.columns:
-        df.set_index('Date', inplace=True)
+    # Load data
+    file_path = data_file(location)
+    df = load_weather_frame(file_path)
+    data_version = forecast_registry.dataset_version(file_path)
    
     # Target columns for forecasting
     target_columns = ['Temperature_C', 'Humidity_%', 'Wind_Speed_kmph', 'UV_Index', 'Atmospheric_Pressure_hPa']
@@ -2274,267 +2277,238 @@ def weather_forecast_page():
     # Date selector
     target_date = st.date_input("Select forecast date")
    
+    # Forecasting backend; fast is as accurate as Prophet on every series this page shows (README comparison)
+    forecast_models = {
+        "Fast (harmonic regression)": 'fast',
+        "Prophet": 'prophet',
+        "Joint (vector autoregression)": 'joint'
+    }
+    backend_label = st.radio("Forecast model", list(forecast_models), horizontal=True)
+    backend = forecast_models[backend_label]
+   
     # Generate forecast button
     if st.button("Generate Forecast", use_container_width=True):
         try:
             # Calculate steps needed for forecasting
             steps = calculate_steps_to_forecast(df, target_date)
            
-            # Dictionary to store forecasts
-            forecasts = {}
+            # Fit every series once in the background; reruns reattach to the same job
+            job = start_forecast_job(df, target_date, steps, data_version, backend, location)
+            st.session_state['forecast_job'] = job.key
            
-            # Add spacing
-            st.markdown("<br>", unsafe_allow_html=True)
-           
-            # Top metric cards
-            cols = st.columns(3)
-            card_metrics = ['Temperature_C', 'Humidity_%', 'Wind_Speed_kmph']
-           
-            for idx, metric in enumerate(card_metrics):
-                forecast_values, _ = fit_prophet_and_forecast(df, metric, steps)
-                latest_forecast = forecast_values[-1]
-                current_value = df[metric].iloc[-1]
-                change = latest_forecast - current_value
-                
-                # Determine trend styling
-                trend_class = "metric-trend-neutral"
-                trend_icon = ""
-                if change > 0:
-                    trend_class = "metric-trend-up"
-                    trend_icon = "↑"
-                elif change < 0:
-                    trend_class = "metric-trend-down"
-                    trend_icon = "↓"
-               
+        except ValueError as e:
+            st.error(f"""
+            <div class="alert alert-danger">
+                <strong>Error:</strong> {str(e)}
+                <p>Please select a valid date range and try again.</p>
+            </div>
+            """, unsafe_allow_html=True)
+   
+    # Render whatever the current job has finished so far
+    job = get_forecast_job(st.session_state.get('forecast_job'))
+    if job is not None and job.error:
+        st.error(f"Error generating forecast: {job.error}")
+    elif job is not None:
+        if not job.done:
+            st.progress(job.progress(), text=f"Forecasting for {job.target_date}... {len(job.forecasts)} of {len(job.columns)} series ready")
+       
+        # Add spacing
+        st.markdown("<br>", unsafe_allow_html=True)
+       
+        # Top metric cards
+        cols = st.columns(3)
+        card_metrics = ['Temperature_C', 'Humidity_%', 'Wind_Speed_kmph']
+       
+        for idx, metric in enumerate(card_metrics):
+            if not job.ready(metric):
                 with cols[idx]:
                     metric_display = metric.replace('_', ' ').replace('C', '°C')
                     st.markdown(f"""
                     <div class="metric-card">
                         <div class="metric-title">{metric_display}</div>
-                        <div class="metric-value">{latest_forecast:.1f}</div>
-                        <div class="{trend_class}">
-                            {trend_icon} {abs(change):.1f} from current
-                        </div>
+                        <div class="metric-value">…</div>
+                        <div class="metric-trend-neutral">Forecasting…</div>
                     </div>
                     """, unsafe_allow_html=True)
+                continue
+            forecast_values = job.values(metric)
+            latest_forecast = forecast_values[-1]
+            current_value = df[metric].iloc[-1]
+            change = latest_forecast - current_value
+            
+            # Determine trend styling
+            trend_class = "metric-trend-neutral"
+            trend_icon = ""
+            if change > 0:
+                trend_class = "metric-trend-up"
+                trend_icon = "↑"
+            elif change < 0:
+                trend_class = "metric-trend-down"
+                trend_icon = "↓"
            
-            # Add spacing
-            st.markdown("<br>", unsafe_allow_html=True)
-           
-            # Forecast tabs
-            tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-                "Temperature", "Humidity", "Wind Speed",
-                "UV Index", "Atmospheric Pressure", "Rainfall"
-            ])
-           
-            with tab1:
-                st.markdown("""
-                <div class="dashboard-card">
-                    <div class="feature-title">Temperature Forecast</div>
-                """, unsafe_allow_html=True)
-                fit_prophet_and_forecast(df, 'Temperature_C', steps)
-                st.markdown("""
-                <div class="forecast-summary">
-                    Temperature forecasts help you plan for crop protection against extreme conditions. 
-                    Monitor closely for heat stress or frost risks.
-                </div>
-                """, unsafe_allow_html=True)
-                st.markdown("</div>", unsafe_allow_html=True)
-               
-            with tab2:
-                st.markdown("""
-                <div class="dashboard-card">
-                    <div class="feature-title">Humidity Forecast</div>
-                """, unsafe_allow_html=True)
-                fit_prophet_and_forecast(df, 'Humidity_%', steps)
-                st.markdown("""
-                <div class="forecast-summary">
-                    Humidity levels affect plant health, disease risk, and irrigation needs.
-                    High humidity increases fungal disease risk, while low humidity may require additional irrigation.
-                </div>
-                """, unsafe_allow_html=True)
-                st.markdown("</div>", unsafe_allow_html=True)
-               
-            with tab3:
-                st.markdown("""
-                <div class="dashboard-card">
-                    <div class="feature-title">Wind Speed Forecast</div>
-                """, unsafe_allow_html=True)
-                fit_prophet_and_forecast(df, 'Wind_Speed_kmph', steps)
-                st.markdown("""
-                <div class="forecast-summary">
-                    Wind speed impacts spraying operations, pollination, and potential plant damage.
-                    Strong winds may require protective measures for delicate crops.
-                </div>
-                """, unsafe_allow_html=True)
-                st.markdown("</div>", unsafe_allow_html=True)
-               
-            with tab4:
-                st.markdown("""
-                <div class="dashboard-card">
-                    <div class="feature-title">UV Index Forecast</div>
-                """, unsafe_allow_html=True)
-                fit_prophet_and_forecast(df, 'UV_Index', steps)
-                st.markdown("""
-                <div class="forecast-summary">
-                    UV index affects outdoor work planning and can impact certain crops.
-                    High UV levels may require protective measures for workers and sensitive plants.
-                </div>
-                """, unsafe_allow_html=True)
-                st.markdown("</div>", unsafe_allow_html=True)
-               
-            with tab5:
-                st.markdown("""
-                <div class="dashboard-card">
-                    <div class="feature-title">Atmospheric Pressure Forecast</div>
-                """, unsafe_allow_html=True)
-                fit_prophet_and_forecast(df, 'Atmospheric_Pressure_hPa', steps)
-                st.markdown("""
-                <div class="forecast-summary">
-                    Atmospheric pressure trends help predict incoming weather systems.
-                    Falling pressure often indicates approaching precipitation or storms.
-                </div>
-                """, unsafe_allow_html=True)
-                st.markdown("</div>", unsafe_allow_html=True)
-               
-            with tab6:
-                st.markdown("""
-                <div class="dashboard-card">
-                    <div class="feature-title">Rainfall Forecast</div>
-                """, unsafe_allow_html=True)
-                fit_prophet_for_rain(df, target_date)
-                st.markdown("""
-                <div class="forecast-summary">
-                    Rainfall predictions are crucial for irrigation planning and field operations.
-                    Plan field activities around expected precipitation events.
+            with cols[idx]:
+                metric_display = metric.replace('_', ' ').replace('C', '°C')
+                st.markdown(f"""
+                <div class="metric-card">
+                    <div class="metric-title">{metric_display}</div>
+                    <div class="metric-value">{latest_forecast:.1f}</div>
+                    <div class="{trend_class}">
+                        {trend_icon} {abs(change):.1f} from current
+                    </div>
                 </div>
                 """, unsafe_allow_html=True)
-                st.markdown("</div>", unsafe_allow_html=True)
-           
-            # Weather alerts section
-            st.markdown("<br>", unsafe_allow_html=True)
+       
+        # Add spacing
+        st.markdown("<br>", unsafe_allow_html=True)
+       
+        # Forecast tabs
+        tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+            "Temperature", "Humidity", "Wind Speed",
+            "UV Index", "Atmospheric Pressure", "Rainfall"
+        ])
+       
+        with tab1:
             st.markdown("""
             <div class="dashboard-card">
-                <div class="feature-title">Weather Alerts</div>
-                <div style="margin-top: 1rem;">
+                <div class="feature-title">Temperature Forecast</div>
             """, unsafe_allow_html=True)
+            plot_when_ready(df, job, 'Temperature_C')
+            st.markdown("""
+            <div class="forecast-summary">
+                Temperature forecasts help you plan for crop protection against extreme conditions. 
+                Monitor closely for heat stress or frost risks.
+            </div>
+            """, unsafe_allow_html=True)
+            st.markdown("</div>", unsafe_allow_html=True)
            
-            # Initialize alerts list
-            alerts = []
-           
-            # Get forecast values for each metric
-            temp_forecast, _ = get_forecast_values(df, 'Temperature_C', steps)
-            humidity_forecast, _ = get_forecast_values(df, 'Humidity_%', steps)
-            wind_forecast, _ = get_forecast_values(df, 'Wind_Speed_kmph', steps)
-            uv_forecast, _ = get_forecast_values(df, 'UV_Index', steps)
-            pressure_forecast, _ = get_forecast_values(df, 'Atmospheric_Pressure_hPa', steps)
-            rainfall_forecast = get_rain_forecast_values(df, target_date)
-           
-            # Temperature alerts
-            if max(temp_forecast) > 35:
-                alerts.append("""
-                <div class="alert alert-danger">
-                    <strong>🔥 High Temperature Alert:</strong> Temperatures expected to exceed 35°C. Take precautions against heat stress for crops and workers. Consider additional irrigation.
-                </div>
-                """)
-            elif min(temp_forecast) < 10:
-                alerts.append("""
-                <div class="alert alert-info">
-                    <strong>❄️ Low Temperature Alert:</strong> Temperatures expected to drop below 10°C. Protect sensitive crops from cold damage. Frost risk for susceptible plants.
-                </div>
-                """)
-           
-            # Humidity alerts
-            if max(humidity_forecast) > 85:
-                alerts.append("""
-                <div class="alert alert-warning">
-                    <strong>💧 High Humidity Alert:</strong> Humidity levels expected to exceed 85%. High risk of fungal diseases in crops. Consider preventative fungicide application.
-                </div>
-                """)
-            elif min(humidity_forecast) < 30:
-                alerts.append("""
-                <div class="alert alert-warning">
-                    <strong>🏜️ Low Humidity Alert:</strong> Humidity levels expected to drop below 30%. Increase irrigation frequency to prevent plant stress and dehydration.
-                </div>
-                """)
-           
-            # Wind alerts
-            if max(wind_forecast) > 25:
-                alerts.append("""
-                <div class="alert alert-danger">
-                    <strong>💨 High Wind Alert:</strong> Wind speeds expected to exceed 25 km/h. Secure loose items and protect sensitive crops. Avoid spraying operations during high winds.
-                </div>
-                """)
-           
-            # UV alerts
-            if max(uv_forecast) > 8:
-                alerts.append("""
-                <div class="alert alert-warning">
-                    <strong>☀️ High UV Alert:</strong> UV Index expected to exceed 8. Ensure adequate protection for outdoor workers and consider shade for sensitive seedlings.
-                </div>
-                """)
-           
-            # Pressure alerts
-            if max(pressure_forecast) > 1025:
-                alerts.append("""
-                <div class="alert alert-info">
-                    <strong>🌤️ High Pressure System:</strong> Clear weather conditions likely. Good for outdoor activities and harvesting operations. Plan field work during this period.
-                </div>
-                """)
-            elif min(pressure_forecast) < 995:
-                alerts.append("""
-                <div class="alert alert-warning">
-                    <strong>🌧️ Low Pressure System:</strong> Possibility of unstable weather conditions. Monitor for rainfall and potential storms. Consider postponing sensitive operations.
-                </div>
-                """)
+        with tab2:
+            st.markdown("""
+            <div class="dashboard-card">
+                <div class="feature-title">Humidity Forecast</div>
+            """, unsafe_allow_html=True)
+            plot_when_ready(df, job, 'Humidity_%')
+            st.markdown("""
+            <div class="forecast-summary">
+                Humidity levels affect plant health, disease risk, and irrigation needs.
+                High humidity increases fungal disease risk, while low humidity may require additional irrigation.
+            </div>
+            """, unsafe_allow_html=True)
+            st.markdown("</div>", unsafe_allow_html=True)
            
-            # Rainfall alerts
-            if rainfall_forecast['yhat'].max() > 70:
-                alerts.append("""
-                <div class="alert alert-danger">
-                    <strong>🌊 Heavy Rain Alert:</strong> High probability of significant rainfall. Prepare drainage systems and check erosion controls. Delay fertilizer applications.
-                </div>
-                """)
-            elif rainfall_forecast['yhat'].max() > 40:
-                alerts.append("""
-                <div class="alert alert-warning">
-                    <strong>🌧️ Moderate Rain Alert:</strong> Moderate chance of rainfall. Plan activities accordingly and be prepared to adjust irrigation schedules.
-                </div>
-                """)
+        with tab3:
+            st.markdown("""
+            <div class="dashboard-card">
+                <div class="feature-title">Wind Speed Forecast</div>
+            """, unsafe_allow_html=True)
+            plot_when_ready(df, job, 'Wind_Speed_kmph')
+            st.markdown("""
+            <div class="forecast-summary">
+                Wind speed impacts spraying operations, pollination, and potential plant damage.
+                Strong winds may require protective measures for delicate crops.
+            </div>
+            """, unsafe_allow_html=True)
+            st.markdown("</div>", unsafe_allow_html=True)
            
-            # Display alerts or "no alerts" message
-            if alerts:
-                for alert in alerts:
-                    st.markdown(alert, unsafe_allow_html=True)
-            else:
-                st.markdown("""
-                <div class="alert alert-success">
-                    <strong>✅ No Alerts:</strong> Weather conditions appear normal for the forecast period. Proceed with standard agricultural operations.
-                </div>
-                """, unsafe_allow_html=True)
+        with tab4:
+            st.markdown("""
+            <div class="dashboard-card">
+                <div class="feature-title">UV Index Forecast</div>
+            """, unsafe_allow_html=True)
+            plot_when_ready(df, job, 'UV_Index')
+            st.markdown("""
+            <div class="forecast-summary">
+                UV index affects outdoor work planning and can impact certain crops.
+                High UV levels may require protective measures for workers and sensitive plants.
+            </div>
+            """, unsafe_allow_html=True)
+            st.markdown("</div>", unsafe_allow_html=True)
            
-            st.markdown("</div></div>", unsafe_allow_html=True)
-            
-            # Add forecast summary section
+        with tab5:
             st.markdown("""
             <div class="dashboard-card">
-                <div class="feature-title">Forecast Summary</div>
-                <p>
-                    This forecast provides predictions based on historical weather data and advanced forecasting models.
-                    Use this information to plan your agricultural activities and make informed decisions for crop management.
-                    Remember that weather forecasts become less accurate the further into the future they predict.
-                </p>
-                
+                <div class="feature-title">Atmospheric Pressure Forecast</div>
+            """, unsafe_allow_html=True)
+            plot_when_ready(df, job, 'Atmospheric_Pressure_hPa')
+            st.markdown("""
+            <div class="forecast-summary">
+                Atmospheric pressure trends help predict incoming weather systems.
+                Falling pressure often indicates approaching precipitation or storms.
             </div>
             """, unsafe_allow_html=True)
+            st.markdown("</div>", unsafe_allow_html=True)
            
-        except ValueError as e:
-            st.error(f"""
-            <div class="alert alert-danger">
-                <strong>Error:</strong> {str(e)}
-                <p>Please select a valid date range and try again.</p>
+        with tab6:
+            st.markdown("""
+            <div class="dashboard-card">
+                <div class="feature-title">Rainfall Forecast</div>
+            """, unsafe_allow_html=True)
+            plot_when_ready(df, job, 'Rain_Probability_%')
+            st.markdown("""
+            <div class="forecast-summary">
+                Rainfall predictions are crucial for irrigation planning and field operations.
+                Plan field activities around expected precipitation events.
             </div>
             """, unsafe_allow_html=True)
+            st.markdown("</div>", unsafe_allow_html=True)
+       
+        # Weather alerts section
+        st.markdown("<br>", unsafe_allow_html=True)
+        st.markdown("""
+        <div class="dashboard-card">
+            <div class="feature-title">Weather Alerts</div>
+            <div style="margin-top: 1rem;">
+        """, unsafe_allow_html=True)
+       
+        # Evaluate the alert rules over the forecast matrix in one pass
+        alert_metrics = ['Temperature_C', 'Humidity_%', 'Wind_Speed_kmph', 'UV_Index', 'Atmospheric_Pressure_hPa', 'Rain_Probability_%']
+        alerts = []
+        if job.done and not job.error:
+            forecast_matrix = np.column_stack([job.values(metric) for metric in alert_metrics])
+            alerts = [
+                f"""
+                <div class="alert alert-{alert['severity']}">
+                    <strong>{alert['title']}:</strong> {alert['message']}
+                </div>
+                """
+                for alert in evaluate_weather(forecast_matrix, alert_metrics)
+            ]
+       
+        # Display alerts or "no alerts" message
+        if not job.done:
+            st.markdown("""
+            <div class="alert alert-info">
+                <strong>⏳ Alerts pending:</strong> Alerts will appear once every series has been forecast.
+            </div>
+            """, unsafe_allow_html=True)
+        elif alerts:
+            for alert in alerts:
+                st.markdown(alert, unsafe_allow_html=True)
+        else:
+            st.markdown("""
+            <div class="alert alert-success">
+                <strong>✅ No Alerts:</strong> Weather conditions appear normal for the forecast period. Proceed with standard agricultural operations.
+            </div>
+            """, unsafe_allow_html=True)
+       
+        st.markdown("</div></div>", unsafe_allow_html=True)
+        
+        # Add forecast summary section
+        st.markdown("""
+        <div class="dashboard-card">
+            <div class="feature-title">Forecast Summary</div>
+            <p>
+                This forecast provides predictions based on historical weather data and advanced forecasting models.
+                Use this information to plan your agricultural activities and make informed decisions for crop management.
+                Remember that weather forecasts become less accurate the further into the future they predict.
+            </p>
+            
+        </div>
+        """, unsafe_allow_html=True)
+       
+        # Poll until the job finishes so each series fills in as it completes
+        if not job.done:
+            time.sleep(FORECAST_POLL_SECONDS)
+            st.rerun()
 def sidebar_auth():
     # Add custom CSS for the sidebar authentication
     st.markdown("""
@@ -2988,46 +2962,8 @@ def calculate_steps_to_forecast(df, target_date):
     return (target_date - last_date).days
 
 
-def get_seasonal_noise(column, month):
-    if column == 'Rainfall_mm':
-        
-        if month in [12, 1, 2]:
-            return 0.1
-        elif month in [7, 8, 9]:
-            return 0.5
-        else:
-            return 0.2
-    return 0.3
-
-
-def fit_prophet_and_forecast(df, column, steps):
-    print(f"Fitting Prophet model for {column}... Forecasting {steps} steps ahead.")
-
-    
-    series = df[column].interpolate().reset_index()
-    series.columns = ['ds', 'y']
-
-    
-    model = Prophet(yearly_seasonality=True)
-    model.fit(series)
-
-    
-    future = model.make_future_dataframe(periods=steps)
-    forecast = model.predict(future)
-
-    
-    forecast_values = forecast[['ds', 'yhat']].tail(steps)
-
-    
-    noise_std = np.std(series['y'].diff().dropna()) * get_seasonal_noise(column, df.index[-1].month)
-    forecast_values['yhat'] += np.random.normal(0, noise_std, size=steps)
-
-    
-    if column == 'Rainfall_mm' and df.index[-1].month in [12, 1, 2]:
-        forecast_values['yhat'] = np.clip(forecast_values['yhat'], 0, 1)
-
-    
-    fig = px.line()
+def plot_forecast(df, column, forecast_values):
+    fig = go.Figure()
    
     
     fig.add_scatter(x=df.index[-90:],
@@ -3036,6 +2972,19 @@ def fit_prophet_and_forecast(df, column, steps):
                    line=dict(color='blue'))
    
     
+    fig.add_scatter(x=forecast_values['ds'],
+                   y=forecast_values['yhat_upper'],
+                   line=dict(width=0),
+                   showlegend=False,
+                   hoverinfo='skip')
+    fig.add_scatter(x=forecast_values['ds'],
+                   y=forecast_values['yhat_lower'],
+                   name='Uncertainty',
+                   fill='tonexty',
+                   fillcolor='rgba(255, 0, 0, 0.15)',
+                   line=dict(width=0))
+   
+    
     fig.add_scatter(x=forecast_values['ds'],
                    y=forecast_values['yhat'],
                    name='Forecast',
@@ -3050,36 +2999,18 @@ def fit_prophet_and_forecast(df, column, steps):
    
     st.plotly_chart(fig)
 
-    return forecast_values['yhat'].values, forecast_values['ds']
-
-
-def fit_prophet_for_rain(df, target_date):
-    steps = calculate_steps_to_forecast(df, target_date)
-    print(f"Fitting Prophet model for Rain_Probability_%... Forecasting {steps} steps ahead.")
-
-    
-    rain_prob_data = df.reset_index()[['Date', 'Rain_Probability_%']]
-    rain_prob_data.columns = ['ds', 'y']
-
-    
-    model = Prophet(yearly_seasonality=True, seasonality_mode='additive')
 
-    
-    model.add_seasonality(name='monthly', period=30.5, fourier_order=5)
-
-    
-    model.fit(rain_prob_data)
-
-    
-    future = model.make_future_dataframe(periods=steps)
-
-    
-    forecast = model.predict(future)
+def plot_when_ready(df, job, column):
+    if not job.ready(column):
+        st.info(f"Forecasting {column.replace('_', ' ')}... this chart will appear as soon as it is ready.")
+        return
+    if column == 'Rain_Probability_%':
+        plot_rain_forecast(df, job.frame(column))
+    else:
+        plot_forecast(df, column, job.frame(column))
 
-    
-    forecast['yhat'] = np.clip(forecast['yhat'], 0, 100)
 
-    
+def plot_rain_forecast(df, forecast_values):
     fig = px.line()
    
     
@@ -3089,8 +3020,8 @@ def fit_prophet_for_rain(df, target_date):
                    line=dict(color='green'))
    
     
-    fig.add_scatter(x=forecast['ds'][-steps:],
-                   y=forecast['yhat'][-steps:],
+    fig.add_scatter(x=forecast_values['ds'],
+                   y=forecast_values['yhat'],
                    name='Forecast',
                    line=dict(color='orange'))
    
@@ -3103,56 +3034,6 @@ def fit_prophet_for_rain(df, target_date):
    
     st.plotly_chart(fig)
 
-    return forecast[['ds', 'yhat']]
-
-
-def get_forecast_values(df, column, steps):
-    
-    series = df[column].interpolate().reset_index()
-    series.columns = ['ds', 'y']
-
-    
-    model = Prophet(yearly_seasonality=True)
-    model.fit(series)
-
-    
-    future = model.make_future_dataframe(periods=steps)
-    forecast = model.predict(future)
-
-    
-    forecast_values = forecast[['ds', 'yhat']].tail(steps)
-
-    
-    noise_std = np.std(series['y'].diff().dropna()) * get_seasonal_noise(column, df.index[-1].month)
-    forecast_values['yhat'] += np.random.normal(0, noise_std, size=steps)
-
-    
-    if column == 'Rainfall_mm' and df.index[-1].month in [12, 1, 2]:
-        forecast_values['yhat'] = np.clip(forecast_values['yhat'], 0, 1)
-
-    return forecast_values['yhat'].values, forecast_values['ds']
-
-
-def get_rain_forecast_values(df, target_date):
-    steps = calculate_steps_to_forecast(df, target_date)
-
-    
-    rain_prob_data = df.reset_index()[['Date', 'Rain_Probability_%']]
-    rain_prob_data.columns = ['ds', 'y']
-
-    
-    model = Prophet(yearly_seasonality=True, seasonality_mode='additive')
-    model.add_seasonality(name='monthly', period=30.5, fourier_order=5)
-    model.fit(rain_prob_data)
-
-    
-    future = model.make_future_dataframe(periods=steps)
-    forecast = model.predict(future)
-
-    
-    forecast['yhat'] = np.clip(forecast['yhat'], 0, 100)
-
-    return forecast[['ds', 'yhat']]
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,230 @@
+import argparse
+import json
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import forecast_engine
+import forecast_registry
+import harmonic_forecast
+import var_forecast
+from weather_data import load_weather_frame
+
+HORIZONS = [1, 7, 30, 90]
+ORIGINS = 4
+ORIGIN_SPACING_DAYS = 90
+
+# ARIMA gets yearly Fourier terms as exogenous regressors, daily data is too long for a seasonal order
+ARIMA_ORDER = (2, 0, 1)
+ARIMA_FOURIER_ORDER = 4
+
+
+def _fit_prophet(config_name=None):
+    # Without a config_name each column gets the config production uses for it
+    def fit(train, column):
+        name = config_name or forecast_registry.COLUMN_CONFIGS.get(column, 'default')
+        model = forecast_registry.build_model(name)
+        model.fit(forecast_registry.prepare_series(train, column, name))
+        return model, name
+
+    def predict(fitted, steps):
+        model, name = fitted
+        return forecast_registry.predict(model, steps, name)['yhat'].to_numpy()
+
+    return fit, predict
+
+
+def _fit_arima(train, column):
+    from statsmodels.tsa.arima.model import ARIMA
+
+    y = train[column].interpolate().bfill().to_numpy(dtype=np.float64)
+    t = np.arange(len(y), dtype=np.float64)
+    exog = harmonic_forecast.design_matrix(t, ARIMA_FOURIER_ORDER, 0)
+    result = ARIMA(y, exog=exog, order=ARIMA_ORDER, trend='n').fit()
+    return result, len(y)
+
+
+def _predict_arima(fitted, steps):
+    result, n = fitted
+    t = np.arange(n, n + steps, dtype=np.float64)
+    exog = harmonic_forecast.design_matrix(t, ARIMA_FOURIER_ORDER, 0)
+    return np.asarray(result.forecast(steps, exog=exog))
+
+
+def _fit_fast(train, column):
+    return harmonic_forecast.HarmonicForecaster().fit(train, [column])
+
+
+def _predict_fast(model, steps):
+    return model.predict(steps)[model.columns[0]]['yhat'].to_numpy()
+
+
+def _fit_joint(train, column):
+    # Every case fits the whole system, so fit_seconds is the cost of one joint fit
+    return var_forecast.JointForecaster().fit(train, var_forecast.joint_columns([column])), column
+
+
+def _predict_joint(fitted, steps):
+    model, column = fitted
+    return model.predict(steps)[column]['yhat'].to_numpy()
+
+
+# name -> (fit(train, column), predict(model, steps))
+BACKENDS = {
+    'prophet': _fit_prophet(),
+    'prophet_rain_monsoon': _fit_prophet('rainfall_monsoon'),
+    'arima': (_fit_arima, _predict_arima),
+    'fast': (_fit_fast, _predict_fast),
+    'joint': (_fit_joint, _predict_joint)
+}
+
+
+def rolling_origins(df, max_horizon, origins=ORIGINS, spacing=ORIGIN_SPACING_DAYS):
+    """Cut-off dates, oldest first, each leaving max_horizon days of actuals after it."""
+    last_origin = df.index[-1] - pd.Timedelta(days=max_horizon)
+    return [last_origin - pd.Timedelta(days=spacing * i) for i in reversed(range(origins))]
+
+
+def score(predicted, actual, horizons):
+    """MAE and MAPE over the first h days for each horizon."""
+    metrics = {}
+    for h in horizons:
+        error = predicted[:h] - actual[:h]
+        nonzero = np.abs(actual[:h]) > 1e-6
+        metrics[f'mae_{h}d'] = round(float(np.mean(np.abs(error))), 4)
+        metrics[f'mape_{h}d'] = (
+            round(float(np.mean(np.abs(error[nonzero] / actual[:h][nonzero])) * 100), 2)
+            if nonzero.any() else None
+        )
+    return metrics
+
+
+def run_case(backend, df, column, origin, horizons):
+    """Fit one backend on data up to origin and score it on the following days."""
+    fit, predict = BACKENDS[backend]
+    train = df[df.index <= origin]
+    actual = df[column][df.index > origin].interpolate().bfill().to_numpy(dtype=np.float64)[:max(horizons)]
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    model = fit(train, column)
+    fit_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    predicted = np.asarray(predict(model, len(actual)), dtype=np.float64)
+    predict_seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'backend': backend,
+        'column': column,
+        'origin': str(origin.date()),
+        'train_rows': len(train),
+        'fit_seconds': round(fit_seconds, 4),
+        'predict_seconds': round(predict_seconds, 4),
+        'peak_python_mb': round(peak / 2**20, 2),
+        **score(predicted, actual, horizons)
+    }
+
+
+def summarize(results):
+    """Mean of every numeric field per (backend, column)."""
+    frame = pd.DataFrame([row for row in results if 'error' not in row])
+    if frame.empty:
+        return []
+    numeric = frame.drop(columns=['origin', 'train_rows']).groupby(['backend', 'column']).mean(numeric_only=True)
+    return numeric.round(4).reset_index().to_dict(orient='records')
+
+
+def compare_joint(results, horizons):
+    """One joint fit against the separate Prophet fits of JOINT_COLUMNS, per origin.
+
+    Uses the rows already produced by the 'prophet' and 'joint' backends:
+    the separate cost is the sum of the per-column Prophet fits, the joint
+    cost is a single fit of the whole system.
+    """
+    frame = pd.DataFrame([row for row in results if 'error' not in row])
+    if frame.empty or not {'prophet', 'joint'} <= set(frame['backend']):
+        return None
+    frame = frame[frame['column'].isin(var_forecast.JOINT_COLUMNS)]
+    prophet = frame[frame['backend'] == 'prophet']
+    joint = frame[frame['backend'] == 'joint']
+
+    mae = [f'mae_{h}d' for h in horizons]
+    accuracy = pd.concat([
+        prophet.groupby('column')[mae].mean().add_prefix('separate_'),
+        joint.groupby('column')[mae].mean().add_prefix('joint_')
+    ], axis=1)
+    return {
+        'columns': sorted(prophet['column'].unique()),
+        'separate_fit_seconds': round(float(prophet.groupby('origin')['fit_seconds'].sum().mean()), 4),
+        'joint_fit_seconds': round(float(joint.groupby('origin')['fit_seconds'].mean().mean()), 4),
+        'accuracy': accuracy.round(4).reset_index().to_dict(orient='records')
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(columns=None, backends=None, horizons=HORIZONS, origins=ORIGINS, file_path=forecast_registry.DATA_FILE):
+    """Rolling-origin backtest of every backend on every column."""
+    columns = columns or forecast_engine.FORECAST_COLUMNS
+    backends = backends or list(BACKENDS)
+    df = load_weather_frame(file_path)
+    cutoffs = rolling_origins(df, max(horizons), origins)
+
+    results = []
+    for backend in backends:
+        for column in columns:
+            for origin in cutoffs:
+                try:
+                    results.append(run_case(backend, df, column, origin, horizons))
+                except ImportError as e:
+                    # Optional backend dependency (statsmodels for ARIMA) not installed
+                    results.append({'backend': backend, 'column': column, 'origin': str(origin.date()), 'error': str(e)})
+                    break
+                except Exception as e:
+                    results.append({'backend': backend, 'column': column, 'origin': str(origin.date()), 'error': str(e)})
+
+    return {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': git_revision(),
+        'dataset_version': forecast_registry.dataset_version(file_path),
+        'rows': len(df),
+        'origins': [str(origin.date()) for origin in cutoffs],
+        'horizons': list(horizons),
+        'memory_note': 'peak_python_mb is the tracemalloc peak of the Python heap; the cmdstan optimizer runs in a child process and is not included',
+        'results': results,
+        'summary': summarize(results),
+        'joint_vs_separate': compare_joint(results, horizons)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest and latency benchmark for the weather forecasters")
+    parser.add_argument('--columns', nargs='+', default=None, help="Columns to forecast (default: all weather columns)")
+    parser.add_argument('--backends', nargs='+', default=None, choices=list(BACKENDS), help="Backends to run (default: all)")
+    parser.add_argument('--horizons', nargs='+', type=int, default=HORIZONS, help="Horizons in days to score")
+    parser.add_argument('--origins', type=int, default=ORIGINS, help="Number of rolling origins")
+    parser.add_argument('--output', default='forecast_benchmark.json', help="Where to write the JSON report")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.columns, args.backends, args.horizons, args.origins)
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+
+    print(pd.DataFrame(report['summary']).to_string(index=False))
+    if report['joint_vs_separate']:
+        comparison = report['joint_vs_separate']
+        columns = comparison['columns']
+        print(f"Fit time, {len(columns)} separate Prophet fits: {comparison['separate_fit_seconds']}s, one joint fit: {comparison['joint_fit_seconds']}s")
+        print(pd.DataFrame(comparison['accuracy']).to_string(index=False))
+    print(f"Report written to {args.output}")
@@ -0,0 +1,82 @@
+import glob
+import io
+import os
+
+import numpy as np
+from PIL import Image
+
+IMAGE_SIZE = (224, 224)
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# Classifier output index -> class label
+index_to_class = {
+    0: "Corn__Common_Rust",
+    1: "Corn__Gray_Leaf_Spot",
+    2: "Corn__healthy",
+    3: "Corn__Northern_Leaf_Blight",
+    4: "Potato___Early_blight",
+    5: "Potato___healthy",
+    6: "Potato___Late_blight",
+    7: "Rice__Healthy",
+    8: "Rice__Leaf_Blast",
+    9: "Rice__Neck_Blast",
+    10: "Wheat_Brown_Rust",
+    11: "Wheat_healthy",
+    12: "Wheat_Yellow_Rust"
+}
+
+
+def load_image_array(source):
+    """Decode an image into a (224, 224, 3) uint8 array, entirely in memory.
+
+    source: file path, raw bytes, file-like object (e.g. a Streamlit upload),
+    PIL image, or an RGB uint8 array of shape (height, width, 3).
+    """
+    if isinstance(source, np.ndarray):
+        if source.shape == IMAGE_SIZE + (3,) and source.dtype == np.uint8:
+            return source
+        img = Image.fromarray(np.asarray(source, dtype=np.uint8))
+    elif isinstance(source, Image.Image):
+        img = source
+    else:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        img = Image.open(source)
+        # JPEGs decode straight at 1/2, 1/4 or 1/8 scale (still >= 224px), so large phone photos are cheap
+        img.draft('RGB', IMAGE_SIZE)
+
+    # Same preprocessing as keras load_img: RGB, nearest-neighbour resize to 224x224
+    img = img.convert('RGB')
+    if img.size != IMAGE_SIZE:
+        img = img.resize(IMAGE_SIZE, Image.NEAREST)
+    return np.asarray(img, dtype=np.uint8)
+
+
+def sample_images(image_dir=None, fallback='try.jpg', count=16):
+    """Decoded sample images for calibration and benchmarks.
+
+    Uses every image under image_dir; without one, flips, rotations and
+    crops of the fallback image stand in for a real sample set.
+    """
+    if image_dir:
+        paths = sorted(
+            path for path in glob.glob(os.path.join(image_dir, '**', '*'), recursive=True)
+            if path.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not paths:
+            raise ValueError(f"No images found under {image_dir}")
+        return np.stack([load_image_array(path) for path in paths])
+
+    base = Image.open(fallback).convert('RGB')
+    width, height = base.size
+    variants = []
+    for i in range(count):
+        img = base.rotate(90 * (i % 4), expand=True)
+        if i % 2:
+            img = img.transpose(Image.FLIP_LEFT_RIGHT)
+        # Progressively tighter centre crops
+        shrink = 1 - 0.05 * (i // 4)
+        w, h = img.size
+        left, top = int(w * (1 - shrink) / 2), int(h * (1 - shrink) / 2)
+        variants.append(load_image_array(img.crop((left, top, w - left, h - top))))
+    return np.stack(variants)
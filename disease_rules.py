@@ -0,0 +1,219 @@
+# Rule-based recommendations for every classifier class (disease_images.index_to_class),
+# used when the LLM is slow or unavailable
+
+# Seasonal nutrient targets in kg/ha; soil N, P, K readings are compared against these
+CROP_TARGETS = {
+    'corn': {'n': 120, 'p': 60, 'k': 40},
+    'potato': {'n': 150, 'p': 80, 'k': 100},
+    'rice': {'n': 100, 'p': 50, 'k': 50},
+    'wheat': {'n': 120, 'p': 60, 'k': 40}
+}
+PH_RANGE = (5.5, 7.5)
+
+# Nutrient share of each fertilizer
+UREA_N = 0.46
+DAP_N, DAP_P = 0.18, 0.46
+MOP_K = 0.60
+
+# Conditions each disease favours: temperature range (°C), humidity (%) and
+# average daily rainfall (mm) at or above which spread is likely
+RULES = {
+    "Corn__Common_Rust": {
+        'crop': 'corn', 'name': 'common rust', 'pathogen': 'Puccinia sorghi (fungus)',
+        'temperature': (16, 25), 'humidity': 85, 'rainfall': 1.0,
+        'remedies': [
+            "Spray azoxystrobin, propiconazole or mancozeb when pustules first appear on the leaves below the ear",
+            "Grow resistant hybrids next season",
+            "Remove volunteer corn and grassy weeds that carry spores"
+        ]
+    },
+    "Corn__Gray_Leaf_Spot": {
+        'crop': 'corn', 'name': 'gray leaf spot', 'pathogen': 'Cercospora zeae-maydis (fungus)',
+        'temperature': (24, 30), 'humidity': 85, 'rainfall': 2.0,
+        'remedies': [
+            "Apply a strobilurin or triazole fungicide (pyraclostrobin, propiconazole) between tasseling and silking",
+            "Rotate away from corn for one to two seasons and bury infected residue",
+            "Improve airflow with recommended plant spacing"
+        ]
+    },
+    "Corn__Northern_Leaf_Blight": {
+        'crop': 'corn', 'name': 'northern leaf blight', 'pathogen': 'Exserohilum turcicum (fungus)',
+        'temperature': (18, 27), 'humidity': 80, 'rainfall': 2.0,
+        'remedies': [
+            "Spray propiconazole or azoxystrobin when lesions reach the third leaf below the ear before tasseling",
+            "Rotate crops and plough under infected residue",
+            "Use hybrids with Ht resistance genes"
+        ]
+    },
+    "Potato___Early_blight": {
+        'crop': 'potato', 'name': 'early blight', 'pathogen': 'Alternaria solani (fungus)',
+        'temperature': (24, 29), 'humidity': 70, 'rainfall': 1.0, 'low_nitrogen': True,
+        'remedies': [
+            "Spray mancozeb or chlorothalonil every 7-10 days, switching to difenoconazole if spots keep spreading",
+            "Remove and destroy infected lower leaves",
+            "Avoid overhead irrigation late in the day and keep plants well fed to reduce stress"
+        ]
+    },
+    "Potato___Late_blight": {
+        'crop': 'potato', 'name': 'late blight', 'pathogen': 'Phytophthora infestans (water mould)',
+        'temperature': (10, 24), 'humidity': 90, 'rainfall': 2.0,
+        'remedies': [
+            "Spray metalaxyl + mancozeb or cymoxanil + mancozeb at once and repeat every 5-7 days in wet weather",
+            "Pull and destroy infected plants away from the field; do not compost them",
+            "Hill up soil around stems to protect tubers and harvest only after the haulm has dried"
+        ]
+    },
+    "Rice__Leaf_Blast": {
+        'crop': 'rice', 'name': 'leaf blast', 'pathogen': 'Magnaporthe oryzae (fungus)',
+        'temperature': (24, 28), 'humidity': 90, 'rainfall': 2.0, 'high_nitrogen': True,
+        'remedies': [
+            "Spray tricyclazole (0.6 g/l) or isoprothiolane at the first lesions, repeat after 10-15 days",
+            "Stop further nitrogen top dressing until the disease is controlled",
+            "Keep the field flooded; drought stress raises blast severity"
+        ]
+    },
+    "Rice__Neck_Blast": {
+        'crop': 'rice', 'name': 'neck blast', 'pathogen': 'Magnaporthe oryzae (fungus)',
+        'temperature': (20, 28), 'humidity': 90, 'rainfall': 2.0, 'high_nitrogen': True,
+        'remedies': [
+            "Spray tricyclazole or azoxystrobin at late booting and again at 50% heading",
+            "Avoid late nitrogen applications",
+            "Burn or remove infected straw after harvest and use certified seed"
+        ]
+    },
+    "Wheat_Brown_Rust": {
+        'crop': 'wheat', 'name': 'brown rust', 'pathogen': 'Puccinia triticina (fungus)',
+        'temperature': (15, 25), 'humidity': 80, 'rainfall': 0.5, 'high_nitrogen': True,
+        'remedies': [
+            "Spray propiconazole or tebuconazole (0.1%) when pustules appear, repeat after 15 days if needed",
+            "Grow resistant varieties and sow on time",
+            "Destroy volunteer wheat between seasons"
+        ]
+    },
+    "Wheat_Yellow_Rust": {
+        'crop': 'wheat', 'name': 'yellow rust', 'pathogen': 'Puccinia striiformis (fungus)',
+        'temperature': (10, 18), 'humidity': 80, 'rainfall': 0.5, 'high_nitrogen': True,
+        'remedies': [
+            "Spray propiconazole or tebuconazole (0.1%) at the first yellow stripes, repeat after 15 days",
+            "Scout the field edges and shaded patches weekly in cool, humid weather",
+            "Grow resistant varieties"
+        ]
+    },
+    "Corn__healthy": {'crop': 'corn', 'watch': ["Corn__Common_Rust", "Corn__Gray_Leaf_Spot", "Corn__Northern_Leaf_Blight"]},
+    "Potato___healthy": {'crop': 'potato', 'watch': ["Potato___Early_blight", "Potato___Late_blight"]},
+    "Rice__Healthy": {'crop': 'rice', 'watch': ["Rice__Leaf_Blast", "Rice__Neck_Blast"]},
+    "Wheat_healthy": {'crop': 'wheat', 'watch': ["Wheat_Brown_Rust", "Wheat_Yellow_Rust"]}
+}
+
+RISK_LEVELS = ['Low', 'Low', 'Moderate', 'High']
+
+
+def _round_kg(amount):
+    return int(round(max(amount, 0) / 5.0) * 5)
+
+
+def fertilizer_advice(rule, soil_type, n, p, k, ph):
+    """Fertilizer doses that close the gap between the soil readings and the crop's targets."""
+    crop = rule['crop']
+    target = CROP_TARGETS[crop]
+    n_gap, p_gap, k_gap = target['n'] - n, target['p'] - p, target['k'] - k
+
+    dap = p_gap / DAP_P if p_gap > 0 else 0
+    urea = (n_gap - dap * DAP_N) / UREA_N if n_gap > 0 else 0
+    mop = k_gap / MOP_K if k_gap > 0 else 0
+
+    advice = []
+    if urea >= 5:
+        if rule.get('high_nitrogen'):
+            urea *= 0.75
+            advice.append(f"Urea {_round_kg(urea)} kg/ha, cut by a quarter because extra nitrogen favours {rule['name']}, in three split doses.")
+        else:
+            advice.append(f"Urea {_round_kg(urea)} kg/ha in two split doses.")
+    elif n_gap < -30:
+        advice.append("Nitrogen is well above the crop's need; skip nitrogen top dressing.")
+    if dap >= 5:
+        advice.append(f"DAP {_round_kg(dap)} kg/ha at sowing or as a basal dose.")
+    if mop >= 5:
+        advice.append(f"Muriate of potash {_round_kg(mop)} kg/ha; potassium also strengthens leaves against infection.")
+    if not advice:
+        advice.append(f"N, P and K already meet {crop} needs (N {n:g}, P {p:g}, K {k:g}); apply 5 t/ha of well-rotted farmyard manure to maintain them.")
+
+    if ph < PH_RANGE[0]:
+        advice.append(f"Soil pH {ph:g} is acidic; apply agricultural lime at about 2 t/ha.")
+    elif ph > PH_RANGE[1]:
+        advice.append(f"Soil pH {ph:g} is alkaline; apply gypsum at about 2 t/ha.")
+
+    soil_type = str(soil_type).lower()
+    if 'sand' in soil_type:
+        advice.append("Sandy soil loses nutrients quickly; give fertilizer in smaller, more frequent doses.")
+    elif 'clay' in soil_type:
+        advice.append("Clay soil holds water; avoid fertilizing just before heavy rain to limit losses.")
+    return ' '.join(advice)
+
+
+def _risk(rule, temperature, rainfall, humidity):
+    low, high = rule['temperature']
+    checks = [
+        (low <= temperature <= high, f"temperature {temperature:g}°C {'is within' if low <= temperature <= high else 'is outside'} its {low}-{high}°C range"),
+        (humidity >= rule['humidity'], f"humidity {humidity:g}% {'is at or above' if humidity >= rule['humidity'] else 'is below'} the {rule['humidity']}% it needs"),
+        (rainfall >= rule['rainfall'], f"rainfall {rainfall:g} mm/day {'keeps' if rainfall >= rule['rainfall'] else 'does not keep'} leaves wet")
+    ]
+    return sum(passed for passed, _ in checks), [reason for _, reason in checks]
+
+
+def outbreak_analysis(rule, temperature, rainfall, humidity, n):
+    if 'watch' in rule:
+        scores = [(_risk(RULES[other], temperature, rainfall, humidity)[0], RULES[other]['name']) for other in rule['watch']]
+        score, name = max(scores)
+        return (
+            f"No disease detected. Of the common {rule['crop']} diseases, the forecast weather suits {name} most "
+            f"(risk {RISK_LEVELS[score]}); scout the crop weekly."
+        )
+
+    score, reasons = _risk(rule, temperature, rainfall, humidity)
+    if rule.get('high_nitrogen') and n > CROP_TARGETS[rule['crop']]['n']:
+        score = min(score + 1, 3)
+        reasons.append(f"high soil nitrogen (N {n:g}) makes plants more susceptible")
+    if rule.get('low_nitrogen') and n < CROP_TARGETS[rule['crop']]['n'] / 2:
+        score = min(score + 1, 3)
+        reasons.append(f"low soil nitrogen (N {n:g}) weakens plants")
+    return (
+        f"{rule['name'].capitalize()} is caused by {rule['pathogen']}. For the next 7 days, " + '; '.join(reasons) + ". "
+        f"Chance of the disease spreading: {RISK_LEVELS[score]}."
+    )
+
+
+def remedies(rule):
+    if 'watch' in rule:
+        return (
+            "No treatment needed. Keep preventive practices: certified seed, crop rotation, balanced fertilization, "
+            "and removing crop residue after harvest."
+        )
+    return ' '.join(f"{remedy}." for remedy in rule['remedies'])
+
+
+def format_sections(sections):
+    headings = {
+        'fertilizer': "1. Fertilizer/Manure Recommendations:",
+        'outbreak': "2. Outbreak Analysis:",
+        'remedies': "3. Remedies:"
+    }
+    return '\n\n'.join(f"{headings[key]} {text}" for key, text in sections.items())
+
+
+def recommend_sections(disease, soil_type, temperature, rainfall, humidity, n, p, k, ph):
+    """Rule-based {section: text} for one of the classifier's classes, matching recommendations.SECTIONS."""
+    rule = RULES[disease]
+    temperature, rainfall, humidity = float(temperature), float(rainfall), float(humidity)
+    n, p, k, ph = float(n), float(p), float(k), float(ph)
+    return {
+        'fertilizer': fertilizer_advice(rule, soil_type, n, p, k, ph),
+        'outbreak': outbreak_analysis(rule, temperature, rainfall, humidity, n),
+        'remedies': remedies(rule)
+    }
+
+
+def recommend(disease, soil_type, temperature, rainfall, humidity, n, p, k, ph):
+    """Rule-based answer in the same layout as the LLM's."""
+    sections = recommend_sections(disease, soil_type, temperature, rainfall, humidity, n, p, k, ph)
+    return format_sections(sections)
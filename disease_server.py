@@ -0,0 +1,287 @@
+import argparse
+import os
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.connection import Client, Listener, answer_challenge, deliver_challenge
+
+import numpy as np
+
+from disease_tflite import BACKENDS, load_classifier
+
+INPUT_SHAPE = (224, 224, 3)
+
+# Runtime loaded and warmed at start-up; others load on their first request
+DEFAULT_BACKEND = os.environ.get('DISEASE_BACKEND', 'keras')
+
+# Local IPC endpoint shared by every Streamlit session and worker process
+HOST = '127.0.0.1'
+PORT = int(os.environ.get('DISEASE_SERVER_PORT', 6010))
+
+# How long a client waits for a server it started to finish loading the model
+START_TIMEOUT = 180
+# After a failed start, requests fail at once for this long instead of starting another server
+START_RETRY_SECONDS = 60
+# Longest a client waits for one reply, including a backend's first load; override with DISEASE_SERVER_TIMEOUT
+REQUEST_TIMEOUT = float(os.environ.get('DISEASE_SERVER_TIMEOUT', 120))
+LOG_FILE = 'disease_server.log'
+KEY_FILE = 'disease_server.key'
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_authkey():
+    """Shared secret for the IPC handshake: DISEASE_SERVER_KEY, or a random per-install key.
+
+    The connection unpickles what it receives, so the key must not be
+    guessable; the generated one lives in KEY_FILE, readable only by its owner.
+    """
+    if os.environ.get('DISEASE_SERVER_KEY'):
+        return os.environ['DISEASE_SERVER_KEY'].encode()
+    path = os.path.join(BASE_DIR, KEY_FILE)
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as file:
+            file.write(secrets.token_hex(32))
+        try:
+            # link fails if another process created the key first; then use theirs
+            os.link(tmp_path, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp_path)
+    with open(path, 'r') as file:
+        return file.read().strip().encode()
+
+
+class ModelServer:
+    """Holds warmed-up classifiers, one per runtime backend, and answers prediction requests over local IPC."""
+
+    def __init__(self, backend=DEFAULT_BACKEND):
+        self.authkey = load_authkey()
+        self.default_backend = backend
+        self.runtimes = {}
+        self.requests = 0
+        self.images = 0
+        self._lock = threading.Lock()
+        self.runtime(backend)
+
+    def runtime(self, backend):
+        """Loaded model for a backend, loading and warming it on first use."""
+        if backend not in self.runtimes:
+            started = time.perf_counter()
+            model = load_classifier(backend)
+            load_seconds = time.perf_counter() - started
+
+            # Trace the graph / allocate tensors once so the first real request doesn't pay for it
+            started = time.perf_counter()
+            model.predict(self._input(backend, np.zeros((1,) + INPUT_SHAPE, dtype=np.uint8)), verbose=0)
+            self.runtimes[backend] = {
+                'model': model,
+                'load_seconds': load_seconds,
+                'warmup_seconds': time.perf_counter() - started
+            }
+        return self.runtimes[backend]['model']
+
+    def _input(self, backend, batch):
+        # TFLite classifiers convert uint8 pixels themselves
+        return to_model_input(batch) if backend == 'keras' else np.asarray(batch)
+
+    def predict(self, batch, backend=None):
+        """Class probabilities for a batch of shape (n, 224, 224, 3), uint8 pixels or floats scaled to 0..1."""
+        backend = backend or self.default_backend
+        with self._lock:
+            model = self.runtime(backend)
+            probabilities = model.predict(self._input(backend, batch), verbose=0)
+            self.requests += 1
+            self.images += len(batch)
+        return probabilities
+
+    def info(self):
+        return {
+            'pid': os.getpid(),
+            'default_backend': self.default_backend,
+            'runtimes': {
+                backend: {'load_seconds': round(runtime['load_seconds'], 3), 'warmup_seconds': round(runtime['warmup_seconds'], 3)}
+                for backend, runtime in self.runtimes.items()
+            },
+            'requests': self.requests,
+            'images': self.images
+        }
+
+    def handle(self, conn):
+        """Authenticate one client connection, then serve it until it closes."""
+        with conn:
+            try:
+                # Here rather than in accept(), so a stalled client only holds up its own thread
+                deliver_challenge(conn, self.authkey)
+                answer_challenge(conn, self.authkey)
+            except Exception:
+                # Wrong key, port scan
+                return
+            while True:
+                try:
+                    op, payload = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    if op == 'predict':
+                        result = self.predict(*payload)
+                    elif op == 'info':
+                        result = self.info()
+                    elif op == 'ping':
+                        result = 'pong'
+                    else:
+                        raise ValueError(f"Unknown operation '{op}'")
+                    conn.send(('ok', result))
+                except Exception as e:
+                    conn.send(('error', str(e)))
+
+    def serve(self, listener):
+        with listener:
+            runtime = self.runtimes[self.default_backend]
+            print(
+                f"Disease model server ready on {listener.address} ({self.default_backend}: "
+                f"load {runtime['load_seconds']:.1f}s, warm-up {runtime['warmup_seconds']:.1f}s)",
+                flush=True
+            )
+            while True:
+                try:
+                    conn = listener.accept()
+                except OSError:
+                    continue
+                threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+
+
+def to_model_input(batch):
+    """float32 0..1 batch; uint8 pixels are scaled here so clients can send 4x less data."""
+    batch = np.asarray(batch)
+    if batch.dtype == np.uint8:
+        return batch.astype(np.float32) / 255.0
+    return batch.astype(np.float32, copy=False)
+
+
+# One connection per client thread, so concurrent sessions don't interleave messages
+_local = threading.local()
+_start_lock = threading.Lock()
+# (time, message) of the last start that failed in this process
+_start_failure = None
+_authkey = None
+
+
+def _connect():
+    global _authkey
+    # Loaded on first use, so a missing or unwritable key only fails the disease page
+    if _authkey is None:
+        _authkey = load_authkey()
+    return Client((HOST, PORT), authkey=_authkey)
+
+
+def start_server():
+    """Launch the server in the background, detached from this process."""
+    with open(os.path.join(BASE_DIR, LOG_FILE), 'a') as log:
+        kwargs = {'cwd': BASE_DIR, 'stdout': log, 'stderr': subprocess.STDOUT}
+        if os.name == 'nt':
+            kwargs['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS
+        else:
+            kwargs['start_new_session'] = True
+        return subprocess.Popen([sys.executable, os.path.join(BASE_DIR, 'disease_server.py')], **kwargs)
+
+
+def connect(autostart=True, timeout=START_TIMEOUT):
+    """Connect to the running server, starting one if none is listening.
+
+    If a server this process started failed to come up, later calls fail
+    at once for START_RETRY_SECONDS rather than starting another one.
+    """
+    global _start_failure
+    try:
+        return _connect()
+    except ConnectionRefusedError:
+        if not autostart:
+            raise
+    with _start_lock:
+        try:
+            return _connect()
+        except ConnectionRefusedError:
+            if _start_failure and time.time() - _start_failure[0] < START_RETRY_SECONDS:
+                raise RuntimeError(_start_failure[1])
+            process = start_server()
+        deadline = time.time() + timeout
+        while True:
+            try:
+                conn = _connect()
+                _start_failure = None
+                return conn
+            except (ConnectionRefusedError, ConnectionResetError, EOFError):
+                # Refused before the server binds; reset/EOF if it dies during the handshake
+                code = process.poll()
+                if code:
+                    message = f"Disease model server failed to start (exit code {code}), see {LOG_FILE}"
+                elif time.time() > deadline:
+                    message = f"Disease model server did not start within {timeout}s, see {LOG_FILE}"
+                else:
+                    # Exit code 0: another process's server holds the port and is still loading
+                    time.sleep(0.5)
+                    continue
+                _start_failure = (time.time(), message)
+                raise RuntimeError(message)
+
+
+def request(op, payload=None):
+    """Send one request on this thread's connection, reconnecting once if the server restarted."""
+    for attempt in range(2):
+        conn = getattr(_local, 'conn', None)
+        if conn is None:
+            conn = _local.conn = connect()
+        try:
+            conn.send((op, payload))
+            if not conn.poll(REQUEST_TIMEOUT):
+                # A late reply would answer the next request, so drop the connection
+                conn.close()
+                _local.conn = None
+                raise RuntimeError(f"Disease model server did not answer within {REQUEST_TIMEOUT:g}s")
+            status, result = conn.recv()
+            break
+        except (EOFError, OSError):
+            _local.conn = None
+            if attempt:
+                raise
+    if status == 'error':
+        raise RuntimeError(result)
+    return result
+
+
+def predict(batch, backend=None):
+    """Class probabilities from the shared server for a (n, 224, 224, 3) batch.
+
+    backend: one of disease_tflite.BACKENDS, or None for the server's default.
+    """
+    batch = np.asarray(batch)
+    if batch.dtype != np.uint8:
+        batch = batch.astype(np.float32, copy=False)
+    return request('predict', (batch, backend))
+
+
+def server_info():
+    return request('info')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local inference server for the crop disease classifier")
+    parser.add_argument('--backend', default=DEFAULT_BACKEND, choices=BACKENDS, help="Runtime to load and warm at start-up")
+    parser.add_argument('--port', type=int, default=PORT)
+    args = parser.parse_args()
+
+    try:
+        # Bind before loading: a second server exits at once, and clients that
+        # connect during the load wait for the handshake instead of failing
+        # The handshake happens per connection in ModelServer.handle
+        listener = Listener((HOST, args.port))
+    except OSError as e:
+        print(f"Not starting, port {args.port} is taken: {e}", flush=True)
+        sys.exit(0)
+    ModelServer(args.backend).serve(listener)
@@ -0,0 +1,196 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from disease_images import sample_images
+
+MODEL_FILE = 'mobilenet_crop_disease_best.h5'
+
+TFLITE_FILES = {
+    'float16': 'mobilenet_crop_disease_fp16.tflite',
+    'int8': 'mobilenet_crop_disease_int8.tflite'
+}
+
+# Runtime backends selectable in disease.py (DISEASE_BACKEND)
+BACKENDS = ['keras', 'tflite_fp16', 'tflite_int8']
+
+BACKEND_FILES = {
+    'keras': MODEL_FILE,
+    'tflite_fp16': TFLITE_FILES['float16'],
+    'tflite_int8': TFLITE_FILES['int8']
+}
+
+# Interpreter threads, override with TFLITE_THREADS
+NUM_THREADS = int(os.environ.get('TFLITE_THREADS', os.cpu_count() or 1))
+
+
+def export_tflite(variant, model_file=MODEL_FILE, image_dir=None, output=None):
+    """Convert the Keras classifier to TFLite and return the written path.
+
+    float16 halves the weights; int8 quantizes weights and activations
+    with ranges calibrated on a representative image set and takes uint8
+    pixels as input.
+    """
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(model_file)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    if variant == 'float16':
+        converter.target_spec.supported_types = [tf.float16]
+    elif variant == 'int8':
+        samples = sample_images(image_dir)
+
+        def representative_dataset():
+            for sample in samples:
+                yield [sample[np.newaxis].astype(np.float32) / 255.0]
+
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.uint8
+        converter.inference_output_type = tf.uint8
+    else:
+        raise ValueError(f"Unknown TFLite variant '{variant}'. Choose from {list(TFLITE_FILES)}.")
+
+    output = output or TFLITE_FILES[variant]
+    tmp_path = f"{output}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as file:
+        file.write(converter.convert())
+    os.replace(tmp_path, output)
+    return output
+
+
+def _interpreter(path, num_threads):
+    # The slim tflite-runtime wheel is enough when installed; otherwise use TensorFlow's
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter(model_path=path, num_threads=num_threads)
+
+
+class TFLiteClassifier:
+    """TFLite interpreter with the Keras model's predict(batch) interface."""
+
+    def __init__(self, path, num_threads=NUM_THREADS):
+        self.interpreter = _interpreter(path, num_threads)
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+        self.batch_size = None
+
+    def _quantize(self, batch):
+        dtype = self.input['dtype']
+        if dtype == np.float32:
+            return batch.astype(np.float32) / 255.0 if batch.dtype == np.uint8 else batch.astype(np.float32)
+        scale, zero_point = self.input['quantization']
+        pixels = batch.astype(np.float32) if batch.dtype == np.uint8 else batch.astype(np.float32) * 255.0
+        if abs(scale * 255.0 - 1.0) < 1e-3 and zero_point == 0 and dtype == np.uint8:
+            # Calibrated on 0..1 inputs, so the quantized value is the pixel itself
+            return pixels.astype(np.uint8)
+        info = np.iinfo(dtype)
+        return np.clip(np.round(pixels / 255.0 / scale + zero_point), info.min, info.max).astype(dtype)
+
+    def predict(self, batch, verbose=0):
+        """Class probabilities for uint8 pixels or 0..1 floats of shape (n, 224, 224, 3)."""
+        batch = np.asarray(batch)
+        if len(batch) != self.batch_size:
+            self.interpreter.resize_tensor_input(self.input['index'], list(batch.shape))
+            self.interpreter.allocate_tensors()
+            self.batch_size = len(batch)
+        self.interpreter.set_tensor(self.input['index'], self._quantize(batch))
+        self.interpreter.invoke()
+        output = self.interpreter.get_tensor(self.output['index'])
+        if self.output['dtype'] != np.float32:
+            scale, zero_point = self.output['quantization']
+            output = (output.astype(np.float32) - zero_point) * scale
+        return output
+
+
+def load_classifier(backend='keras'):
+    """Model object with predict(batch) for a runtime backend."""
+    if backend == 'keras':
+        from tensorflow.keras.models import load_model
+        return load_model(MODEL_FILE)
+    if backend not in BACKEND_FILES:
+        raise ValueError(f"Unknown disease model backend '{backend}'. Choose from {BACKENDS}.")
+    path = BACKEND_FILES[backend]
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} not found, run: python disease_tflite.py export")
+    return TFLiteClassifier(path)
+
+
+def _model_input(backend, batch):
+    # Keras takes 0..1 floats, the TFLite wrapper converts uint8 pixels itself
+    return batch.astype(np.float32) / 255.0 if backend == 'keras' else batch
+
+
+def benchmark(backends=BACKENDS, image_dir=None, repeats=20, batch_size=32):
+    """Latency, throughput, model size and top-1 agreement with Keras for each backend."""
+    images = sample_images(image_dir)
+    batch = np.concatenate([images] * int(np.ceil(batch_size / len(images))))[:batch_size]
+    reference = None
+    rows = []
+
+    for backend in backends:
+        started = time.perf_counter()
+        try:
+            classifier = load_classifier(backend)
+        except (FileNotFoundError, ImportError) as e:
+            rows.append({'backend': backend, 'error': str(e)})
+            continue
+        load_seconds = time.perf_counter() - started
+        classifier.predict(_model_input(backend, images[:1]), verbose=0)
+
+        latencies = []
+        for i in range(repeats):
+            started = time.perf_counter()
+            classifier.predict(_model_input(backend, images[i % len(images)][np.newaxis]), verbose=0)
+            latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for _ in range(max(1, repeats // 4)):
+            classifier.predict(_model_input(backend, batch), verbose=0)
+        batch_seconds = (time.perf_counter() - started) / max(1, repeats // 4)
+
+        top1 = np.argmax(classifier.predict(_model_input(backend, images), verbose=0), axis=1)
+        if backend == 'keras':
+            reference = top1
+
+        rows.append({
+            'backend': backend,
+            'model_mb': round(os.path.getsize(BACKEND_FILES[backend]) / 2**20, 2),
+            'load_seconds': round(load_seconds, 3),
+            'latency_ms_p50': round(float(np.median(latencies)) * 1000, 2),
+            'latency_ms_p95': round(float(np.percentile(latencies, 95)) * 1000, 2),
+            f'throughput_images_per_s_batch{batch_size}': round(batch_size / batch_seconds, 1),
+            'top1_agreement_with_keras': round(float(np.mean(top1 == reference)), 4) if reference is not None else None,
+            'images': len(images)
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the disease classifier to TFLite and benchmark the runtimes")
+    parser.add_argument('command', choices=['export', 'benchmark'])
+    parser.add_argument('--variants', nargs='+', default=list(TFLITE_FILES), choices=list(TFLITE_FILES), help="TFLite variants to export")
+    parser.add_argument('--backends', nargs='+', default=BACKENDS, choices=BACKENDS, help="Backends to benchmark (keras first for agreement)")
+    parser.add_argument('--images', default=None, help="Directory of sample leaf images (default: augmented copies of try.jpg)")
+    parser.add_argument('--output', default='tflite_benchmark.json', help="Where to write the benchmark report")
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        for variant in args.variants:
+            path = export_tflite(variant, image_dir=args.images)
+            print(f"Wrote {path} ({os.path.getsize(path) / 2**20:.1f} MB)")
+    else:
+        report = benchmark(args.backends, args.images)
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+        for row in report:
+            print(json.dumps(row))
+        print(f"Report written to {args.output}")
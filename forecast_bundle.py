@@ -0,0 +1,146 @@
+import threading
+
+import numpy as np
+
+import forecast_service
+import forecast_table
+from weather_data import location_slug
+
+# Series shown on the weather page (metric cards, tabs and alerts)
+BUNDLE_COLUMNS = [
+    'Temperature_C',
+    'Humidity_%',
+    'Wind_Speed_kmph',
+    'UV_Index',
+    'Atmospheric_Pressure_hPa',
+    'Rain_Probability_%'
+]
+
+# Keep only the most recent bundles in memory
+MAX_BUNDLES = 8
+
+_bundles = {}
+_bundles_lock = threading.Lock()
+
+# Half-width of the 80% band the backends report, in standard deviations
+INTERVAL_Z = 1.2816
+
+# Physical limits applied to bands and sampled scenarios
+SERIES_LIMITS = {
+    'Rain_Probability_%': (0, 100),
+    'Rainfall_mm': (0, None)
+}
+
+
+def get_seasonal_noise(column, month):
+    if column == 'Rainfall_mm':
+
+        if month in [12, 1, 2]:
+            return 0.1
+        elif month in [7, 8, 9]:
+            return 0.5
+        else:
+            return 0.2
+    return 0.3
+
+
+def variability_std(df, column):
+    """Season-aware day-to-day variability of a series, as a standard deviation."""
+    series = df[column].interpolate()
+    return np.std(series.diff().dropna()) * get_seasonal_noise(column, df.index[-1].month)
+
+
+def postprocess_forecast(df, column, forecast, steps):
+    """Keep the forecast horizon and apply the page's clipping and variability band.
+
+    Deterministic: the same forecast always gives the same output.
+    """
+    forecast_values = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].tail(steps).reset_index(drop=True)
+
+    if column != 'Rain_Probability_%':
+        # Day-to-day variability widens the band (added in quadrature) instead of jittering yhat
+        spread = INTERVAL_Z * variability_std(df, column)
+        yhat = forecast_values['yhat']
+        forecast_values['yhat_lower'] = yhat - np.hypot(yhat - forecast_values['yhat_lower'], spread)
+        forecast_values['yhat_upper'] = yhat + np.hypot(forecast_values['yhat_upper'] - yhat, spread)
+
+    if column == 'Rainfall_mm' and df.index[-1].month in [12, 1, 2]:
+        for bound in ['yhat', 'yhat_lower', 'yhat_upper']:
+            forecast_values[bound] = np.clip(forecast_values[bound], 0, 1)
+
+    lower, upper = SERIES_LIMITS.get(column, (None, None))
+    if lower is not None or upper is not None:
+        for bound in ['yhat', 'yhat_lower', 'yhat_upper']:
+            forecast_values[bound] = np.clip(forecast_values[bound], lower, upper)
+
+    return forecast_values
+
+
+def sample_scenarios(column, forecast, count=100, seed=0):
+    """Seeded sample paths of shape (count, steps) drawn from a post-processed forecast.
+
+    Each day is normal around yhat with the spread implied by the 80% band,
+    so the same forecast and seed always give the same scenarios.
+    """
+    rng = np.random.default_rng(seed)
+    yhat = forecast['yhat'].to_numpy(dtype=np.float64)
+    sigma = (forecast['yhat_upper'] - forecast['yhat_lower']).to_numpy(dtype=np.float64) / (2 * INTERVAL_Z)
+    paths = yhat + rng.standard_normal((count, len(yhat))) * sigma
+
+    lower, upper = SERIES_LIMITS.get(column, (None, None))
+    if lower is not None or upper is not None:
+        paths = np.clip(paths, lower, upper)
+    return paths
+
+
+class ForecastBundle:
+    """Forecasts for every weather page series, computed once per request."""
+
+    def __init__(self, target_date, data_version, steps, forecasts, backend='prophet', location=None):
+        self.target_date = target_date
+        self.data_version = data_version
+        self.backend = backend
+        self.location = location
+        self.steps = steps
+        self.forecasts = forecasts
+
+    def frame(self, column):
+        """ds, yhat, yhat_lower and yhat_upper for a series."""
+        return self.forecasts[column]
+
+    def values(self, column):
+        """Forecast yhat values for a series."""
+        return self.forecasts[column]['yhat'].values
+
+    def scenarios(self, column, count=100, seed=0):
+        """Seeded sample paths for a series, see sample_scenarios."""
+        return sample_scenarios(column, self.forecasts[column], count, seed)
+
+
+def bundle_key(target_date, data_version, backend='prophet', location=None):
+    return (str(target_date), data_version, backend, location_slug(location))
+
+
+def get_cached_bundle(key):
+    return _bundles.get(key)
+
+
+def store_bundle(bundle):
+    """Keep a finished bundle, evicting the oldest beyond MAX_BUNDLES."""
+    with _bundles_lock:
+        if len(_bundles) >= MAX_BUNDLES:
+            _bundles.pop(next(iter(_bundles)))
+        _bundles[bundle_key(bundle.target_date, bundle.data_version, bundle.backend, bundle.location)] = bundle
+
+
+def iter_forecasts(df, steps, data_version, backend='prophet', columns=BUNDLE_COLUMNS, location=None):
+    """Yield (column, post-processed forecast) pairs as each series becomes available."""
+    # The nightly table answers any date inside its horizon without a model call; it covers the main dataset only
+    table = forecast_table.get_table(data_version) if backend == 'prophet' and not location else None
+    if table is not None and table.covers(steps):
+        raw_forecasts = ((column, table.frame(column, steps)) for column in columns)
+    else:
+        raw_forecasts = forecast_service.forecast_columns(df, columns, steps, data_version, backend=backend, location=location)
+
+    for column, forecast in raw_forecasts:
+        yield column, postprocess_forecast(df, column, forecast, steps)
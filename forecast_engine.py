@@ -0,0 +1,108 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import forecast_registry
+import harmonic_forecast
+import var_forecast
+from weather_data import data_file
+
+# All weather columns the engine knows how to forecast
+FORECAST_COLUMNS = [
+    'Temperature_C',
+    'Humidity_%',
+    'Wind_Speed_kmph',
+    'UV_Index',
+    'Atmospheric_Pressure_hPa',
+    'Rain_Probability_%',
+    'Rainfall_mm'
+]
+
+# 'prophet' fits one Stan model per column, 'fast' solves one harmonic regression for all,
+# 'joint' fits one vector autoregression over all columns with seasonal terms
+BACKENDS = ['prophet', 'fast', 'joint']
+
+# Number of worker processes, override with FORECAST_WORKERS
+MAX_WORKERS = int(os.environ.get('FORECAST_WORKERS', os.cpu_count() or 1))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor(max_workers=None):
+    """Return the shared process pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn keeps Streamlit's threads and sockets out of the workers
+            _executor = ProcessPoolExecutor(
+                max_workers=max_workers or MAX_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _executor
+
+
+def _fit_and_predict(series, column, config_name, data_version, steps, include_history, location=None):
+    """Worker entry point: fit one series, save it to the registry and forecast."""
+    # Workers don't serve later requests, so keep the model on disk only and the cache budget in the app process
+    model = forecast_registry.fit_model(series, column, config_name, data_version, location=location, cache=False)
+    return column, forecast_registry.predict(model, steps, config_name, include_history)
+
+
+def forecast_columns(df, columns, steps, data_version=None, include_history=False, max_workers=None, backend='prophet', location=None):
+    """Yield (column, forecast) pairs as each series finishes.
+
+    Columns with a fitted model in the registry are predicted straight away;
+    the rest are fitted at the same time on the process pool.
+    """
+    if backend == 'fast':
+        yield from harmonic_forecast.forecast_all(df, columns, steps).items()
+        return
+    if backend == 'joint':
+        yield from var_forecast.forecast_all(df, columns, steps).items()
+        return
+    if backend != 'prophet':
+        raise ValueError(f"Unknown forecast backend '{backend}'. Choose from {BACKENDS}.")
+
+    if data_version is None:
+        data_version = forecast_registry.dataset_version(data_file(location))
+
+    pending = []
+    for column in columns:
+        config_name = forecast_registry.COLUMN_CONFIGS.get(column, 'default')
+        model = forecast_registry.cached_model(column, config_name, data_version, location)
+        if model is not None:
+            yield column, forecast_registry.predict(model, steps, config_name, include_history)
+        else:
+            pending.append((column, config_name))
+
+    if not pending:
+        return
+
+    workers = max_workers or MAX_WORKERS
+    if workers <= 1 or len(pending) == 1:
+        # Fitted here in the app process, so keep the model in its cache for the next request
+        for column, config_name in pending:
+            series = forecast_registry.prepare_series(df, column, config_name)
+            model = forecast_registry.fit_model(series, column, config_name, data_version, location=location, cache=True)
+            yield column, forecast_registry.predict(model, steps, config_name, include_history)
+        return
+
+    executor = get_executor(workers)
+    futures = [
+        executor.submit(
+            _fit_and_predict,
+            forecast_registry.prepare_series(df, column, config_name),
+            column, config_name, data_version, steps, include_history, location
+        )
+        for column, config_name in pending
+    ]
+    for future in as_completed(futures):
+        yield future.result()
+
+
+def forecast_all(df, columns=None, steps=7, data_version=None, include_history=False, max_workers=None, backend='prophet', location=None):
+    """Forecast several columns in parallel and return them keyed by column."""
+    columns = columns or FORECAST_COLUMNS
+    return dict(forecast_columns(df, columns, steps, data_version, include_history, max_workers, backend, location))
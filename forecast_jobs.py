@@ -0,0 +1,92 @@
+import threading
+
+import forecast_bundle
+
+# Finished jobs kept around for reruns and other sessions
+MAX_JOBS = 16
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+class ForecastJob:
+    """Weather page forecasts running on a background thread.
+
+    Jobs live in this module rather than in the Streamlit script run, so a
+    rerun (any widget interaction) picks up the same job instead of
+    restarting the fits. Results appear series by series as they finish.
+    """
+
+    def __init__(self, key, target_date, steps, data_version, backend, columns, location=None):
+        self.key = key
+        self.target_date = target_date
+        self.steps = steps
+        self.data_version = data_version
+        self.backend = backend
+        self.location = location
+        self.columns = list(columns)
+        self.forecasts = {}
+        self.error = None
+        self.done = False
+
+    def ready(self, column):
+        return column in self.forecasts
+
+    def frame(self, column):
+        """ds, yhat, yhat_lower and yhat_upper for a finished series."""
+        return self.forecasts[column]
+
+    def values(self, column):
+        """Forecast yhat values for a finished series."""
+        return self.forecasts[column]['yhat'].values
+
+    def scenarios(self, column, count=100, seed=0):
+        """Seeded sample paths for a finished series, see forecast_bundle.sample_scenarios."""
+        return forecast_bundle.sample_scenarios(column, self.forecasts[column], count, seed)
+
+    def progress(self):
+        return len(self.forecasts) / len(self.columns)
+
+    def run(self, df):
+        try:
+            for column, forecast in forecast_bundle.iter_forecasts(df, self.steps, self.data_version, self.backend, self.columns, self.location):
+                self.forecasts[column] = forecast
+            forecast_bundle.store_bundle(forecast_bundle.ForecastBundle(
+                self.target_date, self.data_version, self.steps, dict(self.forecasts), self.backend, self.location
+            ))
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.done = True
+
+
+def start_forecast_job(df, target_date, steps, data_version, backend='prophet', location=None):
+    """Return the running or finished job for this request, starting one if needed."""
+    key = forecast_bundle.bundle_key(target_date, data_version, backend, location)
+    with _jobs_lock:
+        job = _jobs.get(key)
+        if job is not None and job.error is None:
+            return job
+
+        job = ForecastJob(key, target_date, steps, data_version, backend, forecast_bundle.BUNDLE_COLUMNS, location)
+        bundle = forecast_bundle.get_cached_bundle(key)
+        if bundle is not None:
+            job.forecasts = dict(bundle.forecasts)
+            job.done = True
+
+        # Forget the oldest finished jobs, never a running one
+        finished = [k for k, j in _jobs.items() if j.done]
+        for stale in finished[:max(0, len(_jobs) - MAX_JOBS + 1)]:
+            del _jobs[stale]
+        _jobs[key] = job
+
+    if not job.done:
+        threading.Thread(target=job.run, args=(df,), daemon=True, name=f"forecast-{key[3]}-{key[0]}-{key[2]}").start()
+    return job
+
+
+def get_forecast_job(key):
+    """Look up a job by the key stored in the session, or None."""
+    if key is None:
+        return None
+    return _jobs.get(tuple(key))
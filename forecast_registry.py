@@ -0,0 +1,406 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from prophet import Prophet
+from prophet.serialize import model_to_json, model_from_json
+
+from weather_data import data_file, location_slug
+
+# Configure logging
+logging.getLogger('prophet').setLevel(logging.ERROR)
+logging.getLogger('cmdstanpy').setLevel(logging.ERROR)
+
+DATA_FILE = 'final_dataset.csv'
+MODEL_DIR = 'model_cache'
+
+MONSOON_MONTHS = [7, 8, 9]
+
+# Dataset versions kept on disk per (column, config) model
+KEEP_VERSIONS = 3
+
+# Prophet configurations used by the weather page and the disease pipeline
+MODEL_CONFIGS = {
+    'default': {
+        'interpolate': True,
+        'params': {'yearly_seasonality': True},
+        'seasonalities': []
+    },
+    'rain_probability': {
+        'interpolate': False,
+        'params': {'yearly_seasonality': True, 'seasonality_mode': 'additive'},
+        'seasonalities': [
+            {'name': 'monthly', 'period': 30.5, 'fourier_order': 5}
+        ]
+    },
+    'rainfall_monsoon': {
+        'interpolate': False,
+        'params': {'yearly_seasonality': True, 'seasonality_mode': 'multiplicative'},
+        'seasonalities': [
+            {'name': 'monthly', 'period': 30.5, 'fourier_order': 5},
+            {'name': 'monsoon', 'period': 365.25, 'fourier_order': 10, 'condition_name': 'monsoon'}
+        ]
+    }
+}
+
+# Config used for each weather column, anything not listed uses 'default'
+COLUMN_CONFIGS = {
+    'Rain_Probability_%': 'rain_probability',
+    'Rainfall_mm': 'rainfall_monsoon'
+}
+
+# Memory budget for fitted models held in this process, override with MODEL_CACHE_MB
+MODEL_CACHE_BYTES = int(os.environ.get('MODEL_CACHE_MB', 256)) * 2**20
+
+
+class ModelCache:
+    """LRU of fitted models bounded by their serialized size.
+
+    Every model is saved to disk when it is fitted, so eviction only drops
+    the in-memory copy; the next request reloads it from the disk tier.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        with self._lock:
+            entry = self._models.get(path)
+            if entry is None:
+                return None
+            self._models.move_to_end(path)
+            self.memory_hits += 1
+            return entry[0]
+
+    def put(self, path, model, size, from_disk=False):
+        with self._lock:
+            if from_disk:
+                self.disk_hits += 1
+            if path in self._models:
+                self.bytes -= self._models.pop(path)[1]
+            self._models[path] = (model, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes and len(self._models) > 1:
+                _, (_, evicted_size) = self._models.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def discard(self, path):
+        with self._lock:
+            entry = self._models.pop(path, None)
+            if entry is not None:
+                self.bytes -= entry[1]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._models),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else None
+            }
+
+
+# Fitted models already loaded in this process, keyed by model path
+_model_cache = ModelCache(MODEL_CACHE_BYTES)
+
+# Dataset hashes keyed by (path, mtime, size) so reruns don't re-read the file
+_dataset_versions = {}
+
+
+def dataset_version(file_path=DATA_FILE):
+    """Return a content hash of the dataset file."""
+    stat = os.stat(file_path)
+    cache_key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    if cache_key not in _dataset_versions:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                digest.update(chunk)
+        _dataset_versions[cache_key] = digest.hexdigest()
+    return _dataset_versions[cache_key]
+
+
+def config_key(column, config_name):
+    """Hash of the column and the full model config."""
+    payload = json.dumps({
+        'column': column,
+        'config': MODEL_CONFIGS[config_name]
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:8]
+
+
+def shard_dir(location=None):
+    """Directory holding the models of one location."""
+    return os.path.join(MODEL_DIR, location_slug(location))
+
+
+def model_prefix(column, config_name, location=None):
+    """Filename prefix shared by every dataset version of a (column, config) model."""
+    safe_column = column.replace('%', 'pct')
+    return os.path.join(shard_dir(location), f"{safe_column}__{config_name}__{config_key(column, config_name)}__")
+
+
+def model_path(column, config_name, data_version, location=None):
+    """Path of the serialized model on disk."""
+    return f"{model_prefix(column, config_name, location)}{data_version[:16]}.json"
+
+
+def meta_path(path):
+    """Path of the fit timing sidecar for a saved model."""
+    return path[:-len('.json')] + '.meta.json'
+
+
+def add_conditions(frame, config_name):
+    """Add the conditional seasonality columns a config needs."""
+    conditions = [s['condition_name'] for s in MODEL_CONFIGS[config_name]['seasonalities'] if 'condition_name' in s]
+    if 'monsoon' in conditions:
+        frame['monsoon'] = frame['ds'].dt.month.isin(MONSOON_MONTHS)
+    return frame
+
+
+def prepare_series(df, column, config_name='default'):
+    """Turn a Date-indexed frame into Prophet's ds/y layout."""
+    values = df[column]
+    if MODEL_CONFIGS[config_name]['interpolate']:
+        values = values.interpolate()
+    series = values.reset_index()
+    series.columns = ['ds', 'y']
+    return add_conditions(series, config_name)
+
+
+def build_model(config_name='default'):
+    """Create an unfitted Prophet model for a config."""
+    config = MODEL_CONFIGS[config_name]
+    model = Prophet(**config['params'])
+    for seasonality in config['seasonalities']:
+        model.add_seasonality(**seasonality)
+    return model
+
+
+def save_model(model, path):
+    """Write a fitted model to disk atomically and return its size in bytes."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    serialized = model_to_json(model)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as file:
+        file.write(serialized)
+    os.replace(tmp_path, path)
+    return len(serialized)
+
+
+def load_saved_model(path):
+    """Read a fitted model from disk, or None if it is missing or unreadable."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r') as file:
+            return model_from_json(file.read())
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Discarding unreadable model {path}: {str(e)}")
+        return None
+
+
+def cached_model(column, config_name='default', data_version=None, location=None):
+    """Return an already fitted model from memory or disk, or None."""
+    if data_version is None:
+        data_version = dataset_version(data_file(location))
+    path = model_path(column, config_name, data_version, location)
+
+    model = _model_cache.get(path)
+    if model is not None:
+        return model
+
+    model = load_saved_model(path)
+    if model is None:
+        _model_cache.miss()
+        return None
+    _model_cache.put(path, model, os.path.getsize(path), from_disk=True)
+    return model
+
+
+def cache_stats():
+    """Hit/miss counters and memory use of the in-process model cache."""
+    return _model_cache.stats()
+
+
+def warm_start_params(model):
+    """Extract a fitted model's parameters as Stan initial values."""
+    params = {}
+    for name in ['k', 'm', 'sigma_obs']:
+        params[name] = model.params[name][0][0]
+    for name in ['delta', 'beta']:
+        params[name] = model.params[name][0]
+    return params
+
+
+def previous_model(column, config_name, data_version, location=None):
+    """Most recently saved model of the same column, config and location on an older dataset."""
+    current = model_path(column, config_name, data_version, location)
+    candidates = [
+        path for path in glob.glob(f"{model_prefix(column, config_name, location)}*.json")
+        if path != current and not path.endswith('.meta.json')
+    ]
+    for path in sorted(candidates, key=os.path.getmtime, reverse=True):
+        model = load_saved_model(path)
+        if model is not None:
+            return model, path
+    return None, None
+
+
+def load_fit_meta(path):
+    """Fit timings recorded next to a saved model."""
+    try:
+        with open(meta_path(path), 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def fit_model(series, column, config_name='default', data_version=None, warm_start=True, location=None, cache=True):
+    """Fit a model on a prepared ds/y series and register it.
+
+    When an earlier dataset version of the same model exists, the fit is
+    warm-started from its parameters so the optimizer only has to absorb
+    the appended rows. cache=False only saves it to disk, for pool workers
+    that would never reuse an in-memory copy.
+    """
+    if data_version is None:
+        data_version = dataset_version(data_file(location))
+    path = model_path(column, config_name, data_version, location)
+
+    init, previous_path = None, None
+    if warm_start:
+        previous, previous_path = previous_model(column, config_name, data_version, location)
+        if previous is not None:
+            init = warm_start_params(previous)
+
+    model = build_model(config_name)
+    started = time.perf_counter()
+    try:
+        fit_kwargs = {'init': init} if init else {}
+        model.fit(series, **fit_kwargs)
+    except Exception:
+        if init is None:
+            raise
+        # Parameter shapes changed (e.g. fewer changepoints), fall back to a cold fit
+        init = None
+        model = build_model(config_name)
+        started = time.perf_counter()
+        model.fit(series)
+    fit_seconds = time.perf_counter() - started
+
+    previous_meta = load_fit_meta(previous_path) if init else {}
+    meta = {
+        'column': column,
+        'config': config_name,
+        'data_version': data_version,
+        'rows': len(series),
+        'mode': 'warm' if init else 'cold',
+        'fit_seconds': round(fit_seconds, 3),
+        'cold_seconds': previous_meta.get('cold_seconds') if init else round(fit_seconds, 3),
+        'cold_rows': previous_meta.get('cold_rows') if init else len(series)
+    }
+
+    size = save_model(model, path)
+    with open(meta_path(path), 'w') as file:
+        json.dump(meta, file)
+    prune_versions(column, config_name, location)
+    if cache:
+        _model_cache.put(path, model, size)
+    return model
+
+
+def prune_versions(column, config_name, location=None):
+    """Delete all but the newest KEEP_VERSIONS saved versions of a model."""
+    paths = [
+        path for path in glob.glob(f"{model_prefix(column, config_name, location)}*.json")
+        if not path.endswith('.meta.json')
+    ]
+    for path in sorted(paths, key=os.path.getmtime, reverse=True)[KEEP_VERSIONS:]:
+        for stale in [path, meta_path(path)]:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+        _model_cache.discard(path)
+
+
+def predict(model, steps, config_name='default', include_history=False):
+    """Forecast `steps` days past the end of the training data."""
+    future = model.make_future_dataframe(periods=steps, include_history=include_history)
+    future = add_conditions(future, config_name)
+    return model.predict(future)
+
+
+def fit_report(data_version=None, location=None):
+    """Fit timings for every model of a dataset version, warm fits compared with the last cold fit."""
+    if data_version is None:
+        data_version = dataset_version(data_file(location))
+    report = []
+    for path in sorted(glob.glob(os.path.join(shard_dir(location), f"*__{data_version[:16]}.meta.json"))):
+        with open(path, 'r') as file:
+            meta = json.load(file)
+        if meta.get('mode') == 'warm' and meta.get('cold_seconds'):
+            meta['speedup'] = round(meta['cold_seconds'] / max(meta['fit_seconds'], 1e-6), 2)
+        report.append(meta)
+    return report
+
+
+def benchmark_refit(df, column, config_name='default'):
+    """Time a cold fit and a warm-started refit of the same data."""
+    series = prepare_series(df, column, config_name)
+    cutoff = series['ds'].max() - np.timedelta64(30, 'D')
+
+    base = build_model(config_name)
+    base.fit(series[series['ds'] <= cutoff])
+
+    started = time.perf_counter()
+    build_model(config_name).fit(series)
+    cold_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    build_model(config_name).fit(series, init=warm_start_params(base))
+    warm_seconds = time.perf_counter() - started
+
+    return {
+        'column': column,
+        'config': config_name,
+        'rows': len(series),
+        'cold_seconds': round(cold_seconds, 3),
+        'warm_seconds': round(warm_seconds, 3),
+        'speedup': round(cold_seconds / max(warm_seconds, 1e-6), 2)
+    }
+
+
+if __name__ == "__main__":
+    from weather_data import load_weather_frame
+    df = load_weather_frame(DATA_FILE)
+
+    for column in ['Temperature_C', 'Humidity_%', 'Wind_Speed_kmph', 'UV_Index', 'Atmospheric_Pressure_hPa']:
+        print(json.dumps(benchmark_refit(df, column)))
+    print(json.dumps(benchmark_refit(df, 'Rain_Probability_%', 'rain_probability')))
+    print(json.dumps(benchmark_refit(df, 'Rainfall_mm', 'rainfall_monsoon')))
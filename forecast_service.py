@@ -0,0 +1,94 @@
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+import forecast_engine
+import forecast_registry
+from weather_data import data_file, location_slug
+
+# Forecasts being computed right now, keyed by request_key
+_inflight = {}
+_lock = threading.Lock()
+
+_counters = {
+    'requests': 0,
+    'computed': 0,
+    'coalesced': 0,
+    'failed': 0
+}
+
+
+def request_key(column, steps, data_version, backend='prophet', location=None, include_history=False):
+    """Identity of a single-series forecast request."""
+    return (column, steps, data_version, backend, location_slug(location), include_history)
+
+
+def _finish(key, future, result=None, error=None):
+    with _lock:
+        _inflight.pop(key, None)
+        _counters['failed' if error is not None else 'computed'] += 1
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def forecast_columns(df, columns, steps, data_version=None, include_history=False, backend='prophet', location=None):
+    """Yield (column, forecast) pairs, sharing work with identical requests already in flight.
+
+    Series no other session is computing are forecast here through the
+    engine; the rest wait for the session that started them. Every caller
+    gets its own copy of the result.
+    """
+    if data_version is None:
+        data_version = forecast_registry.dataset_version(data_file(location))
+
+    owned, joined = {}, {}
+    with _lock:
+        for column in columns:
+            key = request_key(column, steps, data_version, backend, location, include_history)
+            _counters['requests'] += 1
+            future = _inflight.get(key)
+            if future is None:
+                future = Future()
+                _inflight[key] = future
+                owned[column] = (key, future)
+            else:
+                _counters['coalesced'] += 1
+                joined[future] = column
+
+    try:
+        if owned:
+            for column, forecast in forecast_engine.forecast_columns(
+                df, list(owned), steps, data_version, include_history, backend=backend, location=location
+            ):
+                key, future = owned[column]
+                _finish(key, future, result=forecast)
+                yield column, forecast.copy()
+    except BaseException as e:
+        # Never leave waiters hanging on a failed or abandoned computation
+        error = e if isinstance(e, Exception) else RuntimeError("Forecast request was cancelled")
+        for key, future in owned.values():
+            if not future.done():
+                _finish(key, future, error=error)
+        raise
+
+    pending = set(joined)
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield joined[future], future.result().copy()
+
+
+def forecast_all(df, columns=None, steps=7, data_version=None, include_history=False, backend='prophet', location=None):
+    """Coalesced forecasts for several columns, keyed by column."""
+    columns = columns or forecast_engine.FORECAST_COLUMNS
+    return dict(forecast_columns(df, columns, steps, data_version, include_history, backend, location))
+
+
+def stats():
+    """Request counters; coalesced requests waited on another session's computation."""
+    with _lock:
+        counters = dict(_counters)
+        counters['inflight'] = len(_inflight)
+    counters['coalesce_rate'] = round(counters['coalesced'] / counters['requests'], 3) if counters['requests'] else None
+    return counters
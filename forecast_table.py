@@ -0,0 +1,104 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import forecast_engine
+import forecast_registry
+from weather_data import load_weather_frame
+
+TABLE_FILE = 'forecast_table.npz'
+HORIZON_DAYS = 365
+
+BOUNDS = ['yhat', 'yhat_lower', 'yhat_upper']
+
+# Loaded table keyed by (path, mtime) so reruns don't re-read the file
+_table_cache = {}
+
+
+class ForecastTable:
+    """Precomputed daily forecasts; a date lookup is an offset from the first forecast day."""
+
+    def __init__(self, data_version, start, arrays):
+        self.data_version = data_version
+        self.start = pd.Timestamp(start)
+        self.arrays = arrays
+        self.horizon = len(next(iter(arrays.values())))
+
+    def offset(self, date):
+        """Row of a date in the table (0 is the day after the last observation)."""
+        return (pd.Timestamp(date) - self.start).days
+
+    def covers(self, steps):
+        return 0 < steps <= self.horizon
+
+    def dates(self, steps):
+        return pd.date_range(self.start, periods=steps, freq='D')
+
+    def values(self, column, steps, bound='yhat'):
+        """First `steps` forecast values of a column, as an array view."""
+        return self.arrays[f"{column}__{bound}"][:steps]
+
+    def frame(self, column, steps):
+        """ds/yhat/yhat_lower/yhat_upper frame for the first `steps` days."""
+        data = {'ds': self.dates(steps)}
+        for bound in BOUNDS:
+            data[bound] = self.values(column, steps, bound).astype(np.float64)
+        return pd.DataFrame(data)
+
+
+def build_table(file_path=forecast_registry.DATA_FILE, table_path=TABLE_FILE, horizon=HORIZON_DAYS, backend='prophet'):
+    """Forecast every weather column over the horizon and write the table."""
+    data_version = forecast_registry.dataset_version(file_path)
+    df = load_weather_frame(file_path)
+    forecasts = forecast_engine.forecast_all(df, forecast_engine.FORECAST_COLUMNS, horizon, data_version, backend=backend)
+
+    arrays = {}
+    for column, forecast in forecasts.items():
+        for bound in BOUNDS:
+            arrays[f"{column}__{bound}"] = forecast[bound].to_numpy(dtype=np.float32)
+
+    start = df.index[-1] + pd.Timedelta(days=1)
+    tmp_path = f"{table_path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp_path, data_version=np.array(data_version), start=np.array(str(start.date())), **arrays)
+    os.replace(tmp_path, table_path)
+    return ForecastTable(data_version, start, arrays)
+
+
+def load_table(table_path=TABLE_FILE):
+    """Read the table from disk, or None if there is none."""
+    if not os.path.exists(table_path):
+        return None
+    cache_key = (os.path.abspath(table_path), os.stat(table_path).st_mtime_ns)
+    if cache_key not in _table_cache:
+        with np.load(table_path) as data:
+            arrays = {key: data[key] for key in data.files if key not in ('data_version', 'start')}
+            table = ForecastTable(str(data['data_version']), str(data['start']), arrays)
+        _table_cache.clear()
+        _table_cache[cache_key] = table
+    return _table_cache[cache_key]
+
+
+def get_table(data_version=None, table_path=TABLE_FILE):
+    """Return the table if it was built from the current dataset, otherwise None."""
+    if data_version is None:
+        data_version = forecast_registry.dataset_version()
+    table = load_table(table_path)
+    if table is None or table.data_version != data_version:
+        return None
+    return table
+
+
+def refresh_table(file_path=forecast_registry.DATA_FILE, table_path=TABLE_FILE):
+    """Rebuild the table only if the dataset changed since it was built."""
+    table = get_table(forecast_registry.dataset_version(file_path), table_path)
+    if table is not None:
+        return table, False
+    return build_table(file_path, table_path), True
+
+
+if __name__ == "__main__":
+    # Run nightly (e.g. from cron) after new rows are appended to the dataset
+    table, rebuilt = refresh_table()
+    status = "Rebuilt" if rebuilt else "Up to date:"
+    print(f"{status} {TABLE_FILE} ({table.horizon} days from {table.start.date()}, data {table.data_version[:12]})")
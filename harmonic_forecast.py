@@ -0,0 +1,138 @@
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+import forecast_registry
+from weather_data import load_weather_frame
+
+YEAR_DAYS = 365.25
+MONTH_DAYS = 30.5
+
+# Fourier orders match the Prophet configs (yearly default is 10, monthly 5)
+YEARLY_ORDER = 10
+MONTHLY_ORDER = 5
+
+# z-score for an 80% band, the same interval width Prophet reports by default
+INTERVAL_Z = 1.2816
+
+
+def design_matrix(t, yearly_order=YEARLY_ORDER, monthly_order=MONTHLY_ORDER):
+    """Intercept, linear trend and yearly/monthly Fourier terms for day offsets t."""
+    columns = [np.ones_like(t), t / YEAR_DAYS]
+    for period, order in [(YEAR_DAYS, yearly_order), (MONTH_DAYS, monthly_order)]:
+        for k in range(1, order + 1):
+            angle = 2 * np.pi * k * t / period
+            columns.append(np.sin(angle))
+            columns.append(np.cos(angle))
+    return np.column_stack(columns)
+
+
+class HarmonicForecaster:
+    """Trend plus yearly/monthly harmonics, solved for all columns in one least-squares call."""
+
+    def __init__(self, yearly_order=YEARLY_ORDER, monthly_order=MONTHLY_ORDER):
+        self.yearly_order = yearly_order
+        self.monthly_order = monthly_order
+
+    def fit(self, df, columns):
+        values = df[columns].interpolate().bfill().ffill().to_numpy(dtype=np.float64)
+        self.columns = list(columns)
+        self.start = df.index[0]
+        self.end = df.index[-1]
+        t = self._offsets(df.index)
+        X = design_matrix(t, self.yearly_order, self.monthly_order)
+        self.coef, _, _, _ = np.linalg.lstsq(X, values, rcond=None)
+        residuals = values - X @ self.coef
+        self.sigma = residuals.std(axis=0)
+        return self
+
+    def predict(self, steps):
+        """Forecast `steps` days past the training data, keyed by column."""
+        ds = pd.date_range(self.end + pd.Timedelta(days=1), periods=steps, freq='D')
+        X = design_matrix(self._offsets(ds), self.yearly_order, self.monthly_order)
+        yhat = X @ self.coef
+        band = INTERVAL_Z * self.sigma
+        return {
+            column: pd.DataFrame({
+                'ds': ds,
+                'yhat': yhat[:, i],
+                'yhat_lower': yhat[:, i] - band[i],
+                'yhat_upper': yhat[:, i] + band[i]
+            })
+            for i, column in enumerate(self.columns)
+        }
+
+    def _offsets(self, index):
+        return ((index - self.start) / pd.Timedelta(days=1)).to_numpy(dtype=np.float64)
+
+
+def forecast_all(df, columns, steps):
+    """Fit and forecast every column in a single batched solve."""
+    return HarmonicForecaster().fit(df, columns).predict(steps)
+
+
+def compare_backends(df, columns, holdout_years=3, horizons=(7, 30, 90, 365)):
+    """Hold out each of the last `holdout_years` calendar years and score both backends.
+
+    Returns one row per (year, column, backend) with fit time, predict time
+    and MAE at each horizon.
+    """
+    rows = []
+    last_year = df.index[-1].year
+    for year in range(last_year - holdout_years + 1, last_year + 1):
+        train = df[df.index < pd.Timestamp(year=year, month=1, day=1)]
+        test = df[df.index.year == year]
+        if train.empty or test.empty:
+            continue
+        steps = len(test)
+
+        started = time.perf_counter()
+        fast = HarmonicForecaster().fit(train, columns)
+        fast_fit = time.perf_counter() - started
+        started = time.perf_counter()
+        fast_forecasts = fast.predict(steps)
+        fast_predict = time.perf_counter() - started
+
+        for column in columns:
+            actual = test[column].interpolate().bfill().to_numpy()
+            config_name = forecast_registry.COLUMN_CONFIGS.get(column, 'default')
+
+            started = time.perf_counter()
+            model = forecast_registry.build_model(config_name)
+            model.fit(forecast_registry.prepare_series(train, column, config_name))
+            prophet_fit = time.perf_counter() - started
+            started = time.perf_counter()
+            prophet_forecast = forecast_registry.predict(model, steps, config_name)
+            prophet_predict = time.perf_counter() - started
+
+            results = [
+                ('prophet', prophet_forecast['yhat'].to_numpy(), prophet_fit, prophet_predict),
+                # Batched fit time is shared by all columns
+                ('fast', fast_forecasts[column]['yhat'].to_numpy(), fast_fit / len(columns), fast_predict / len(columns))
+            ]
+            for backend, predicted, fit_seconds, predict_seconds in results:
+                row = {
+                    'year': year,
+                    'column': column,
+                    'backend': backend,
+                    'fit_seconds': round(fit_seconds, 4),
+                    'predict_seconds': round(predict_seconds, 4)
+                }
+                for horizon in horizons:
+                    h = min(horizon, steps)
+                    row[f'mae_{horizon}d'] = round(float(np.mean(np.abs(predicted[:h] - actual[:h]))), 3)
+                rows.append(row)
+    return rows
+
+
+if __name__ == "__main__":
+    df = load_weather_frame(forecast_registry.DATA_FILE)
+    columns = ['Temperature_C', 'Humidity_%', 'Wind_Speed_kmph', 'UV_Index',
+               'Atmospheric_Pressure_hPa', 'Rain_Probability_%', 'Rainfall_mm']
+    results = compare_backends(df, columns)
+    with open('backend_comparison.json', 'w') as file:
+        json.dump(results, file, indent=2)
+    summary = pd.DataFrame(results).groupby(['column', 'backend']).mean(numeric_only=True).drop(columns='year')
+    print(summary.to_string())
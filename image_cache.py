@@ -0,0 +1,150 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+CACHE_FILE = 'disease_cache.json'
+
+# Hashes within this many differing bits (of 64) count as the same photo
+TOLERANCE = int(os.environ.get('DISEASE_CACHE_TOLERANCE', 4))
+TTL_SECONDS = float(os.environ.get('DISEASE_CACHE_TTL_HOURS', 24 * 7)) * 3600
+MAX_ENTRIES = int(os.environ.get('DISEASE_CACHE_ENTRIES', 5000))
+
+DCT_SIZE = 32
+HASH_SIZE = 8
+
+
+def _dct_matrix(n):
+    """Orthonormal DCT-II basis, so a 2-D DCT is two matrix products."""
+    k = np.arange(n)[:, np.newaxis]
+    basis = np.cos(np.pi * (2 * np.arange(n) + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    basis[0] /= np.sqrt(2)
+    return basis
+
+
+_DCT = _dct_matrix(DCT_SIZE)
+
+
+def perceptual_hash(pixels):
+    """64-bit DCT hash of a decoded image; re-encoded or slightly edited copies differ in a few bits."""
+    gray = Image.fromarray(np.asarray(pixels, dtype=np.uint8)).convert('L').resize((DCT_SIZE, DCT_SIZE), Image.BILINEAR)
+    coeffs = _DCT @ np.asarray(gray, dtype=np.float64) @ _DCT.T
+    low = coeffs[:HASH_SIZE, :HASH_SIZE].flatten()
+    # The DC term is overall brightness, keep it out of the threshold
+    bits = low > np.median(low[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming_distances(hashes, target):
+    """Differing bits between every hash in a uint64 array and one hash."""
+    xor = np.bitwise_xor(hashes, np.uint64(target))
+    return np.unpackbits(xor.view(np.uint8)).reshape(-1, 64).sum(axis=1)
+
+
+class ResultCache:
+    """Classifier probabilities keyed by perceptual hash, with LRU and TTL eviction.
+
+    Entries are saved to a JSON file after inserts and reloaded when
+    another process has written it, so all app processes share one cache.
+    """
+
+    def __init__(self, path=CACHE_FILE, tolerance=TOLERANCE, ttl_seconds=TTL_SECONDS, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.tolerance = tolerance
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._reload()
+
+    def get(self, image_hash, backend):
+        """Probabilities of the closest cached image within tolerance, or None."""
+        with self._lock:
+            self._reload()
+            self._expire()
+            keys = [key for key in self._entries if key[0] == backend]
+            if keys:
+                distances = hamming_distances(np.array([key[1] for key in keys], dtype=np.uint64), image_hash)
+                best = int(np.argmin(distances))
+                if distances[best] <= self.tolerance:
+                    self._entries.move_to_end(keys[best])
+                    self.hits += 1
+                    return np.array(self._entries[keys[best]]['probabilities'], dtype=np.float32)
+            self.misses += 1
+            return None
+
+    def put(self, image_hash, backend, probabilities, save=True):
+        with self._lock:
+            self._reload()
+            key = (backend, image_hash)
+            self._entries.pop(key, None)
+            self._entries[key] = {'probabilities': [float(p) for p in probabilities], 'created': time.time()}
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if save:
+                self._save()
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+                'tolerance_bits': self.tolerance
+            }
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl_seconds
+        for key in [key for key, entry in self._entries.items() if entry['created'] < cutoff]:
+            del self._entries[key]
+
+    def _reload(self):
+        """Pick up entries another process saved since we last looked."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, 'r') as file:
+                saved = json.load(file)
+        except (OSError, ValueError):
+            return
+        entries = OrderedDict()
+        for backend, image_hash, probabilities, created in saved:
+            entries[(backend, int(image_hash, 16))] = {'probabilities': probabilities, 'created': created}
+        # Keep entries not saved yet, and our recently used ones stay the most recent
+        for key, entry in self._entries.items():
+            if key in entries:
+                entries.move_to_end(key)
+            else:
+                entries[key] = entry
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+        self._entries = entries
+        self._mtime = mtime
+
+    def _save(self):
+        saved = [
+            [backend, f"{image_hash:016x}", entry['probabilities'], entry['created']]
+            for (backend, image_hash), entry in self._entries.items()
+        ]
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(saved, file)
+        os.replace(tmp_path, self.path)
+        self._mtime = os.stat(self.path).st_mtime_ns
@@ -1,5 +1,7 @@
 import numpy as np
-import pickle
+import pandas as pd
+
+import model_registry
 
 average_yields = {
     'rice': 4.0, 'maize': 3.5, 'chickpea': 1.2, 'kidneybeans': 1.1, 'pigeonpeas': 1.0,
@@ -105,16 +107,10 @@ class CropProfitAnalyzer:
         self.model = model
         self.crop_list = list(average_yields.keys())
         
+    @staticmethod
     def load_model(model_path):
-        try:
-            with open(model_path, 'rb') as file:
-                model_data = pickle.load(file)
-                
-                if isinstance(model_data, dict):
-                    return model_data['model']
-                return model_data
-        except Exception as e:
-            return None    
+        """Shared per-process copy of the model (see model_registry.py)."""
+        return model_registry.load_model(model_path)
         
     def predict_profit(self, input_values):
         """
@@ -196,7 +192,7 @@ class CropProfitAnalyzer:
 
 # Example usage
 def analyze_crop_profits(model_path, input_values):
-    model = load_model(model_path)
+    model = model_registry.load_model(model_path)
     analyzer = CropProfitAnalyzer(model)
     top_crops = analyzer.predict_profit(input_values)
     
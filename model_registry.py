@@ -0,0 +1,165 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+import tracemalloc
+
+# How often a cached model's file is checked for a new version
+CHECK_SECONDS = float(os.environ.get('MODEL_REGISTRY_CHECK_SECONDS', 2))
+CHECKSUM_SUFFIX = '.sha256'
+
+
+def checksum_path(path):
+    return path + CHECKSUM_SUFFIX
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def pin_checksum(path):
+    """Write the artifact's checksum next to it; publish a new model by replacing both."""
+    sha256 = file_sha256(path)
+    tmp_path = f"{checksum_path(path)}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as file:
+        file.write(f"{sha256}  {os.path.basename(path)}\n")
+    os.replace(tmp_path, checksum_path(path))
+    return sha256
+
+
+def expected_checksum(path):
+    """Pinned checksum for an artifact, or None if it has none."""
+    try:
+        with open(checksum_path(path), 'r') as file:
+            return file.read().split()[0]
+    except (OSError, IndexError):
+        return None
+
+
+def _unpickle(data):
+    model = pickle.loads(data)
+    # Newer artifacts wrap the estimator with its metadata
+    if isinstance(model, dict):
+        return model['model']
+    return model
+
+
+class ModelRegistry:
+    """Pickled models loaded once per process and reloaded when their file changes.
+
+    A model whose file no longer matches its pinned checksum (a partial
+    copy, or a model file replaced without its .sha256) is not loaded;
+    the previous version keeps serving until a valid one is in place.
+    """
+
+    def __init__(self, check_seconds=CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        path = os.path.abspath(path)
+        entry = self._entries.get(path)
+        if entry and time.time() - entry['checked'] < self.check_seconds:
+            return entry['model']
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and time.time() - entry['checked'] < self.check_seconds:
+                return entry['model']
+            stat = os.stat(path)
+            if entry and (stat.st_mtime_ns, stat.st_size) == entry['file']:
+                entry['checked'] = time.time()
+                return entry['model']
+            try:
+                self._entries[path] = self._load(path, entry)
+            except Exception as e:
+                if entry is None:
+                    raise
+                # Keep serving the loaded version and retry at the next check
+                entry.update(checked=time.time(), error=str(e))
+            return self._entries[path]['model']
+
+    def _load(self, path, previous):
+        started = time.perf_counter()
+        with open(path, 'rb') as file:
+            stat = os.fstat(file.fileno())
+            data = file.read()
+        sha256 = hashlib.sha256(data).hexdigest()
+        expected = expected_checksum(path)
+        if expected is not None and expected != sha256:
+            raise ValueError(f"Checksum mismatch for {os.path.basename(path)}: expected {expected[:12]}, got {sha256[:12]}")
+
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        model = _unpickle(data)
+        after, _ = tracemalloc.get_traced_memory()
+        if not tracing:
+            tracemalloc.stop()
+
+        return {
+            'model': model,
+            'file': (stat.st_mtime_ns, stat.st_size),
+            'sha256': sha256,
+            'verified': expected is not None,
+            'load_seconds': time.perf_counter() - started,
+            'memory_bytes': after - before,
+            'loaded_at': time.time(),
+            'checked': time.time(),
+            'version': previous['version'] + 1 if previous else 1,
+            'error': None
+        }
+
+    def info(self):
+        """Load time, retained memory, checksum and version of every loaded model."""
+        with self._lock:
+            return {
+                os.path.basename(path): {
+                    'sha256': entry['sha256'],
+                    'verified': entry['verified'],
+                    'version': entry['version'],
+                    'file_mb': round(entry['file'][1] / 2**20, 2),
+                    'load_seconds': round(entry['load_seconds'], 3),
+                    'memory_mb': round(entry['memory_bytes'] / 2**20, 2),
+                    'loaded_at': entry['loaded_at'],
+                    'reload_error': entry['error']
+                }
+                for path, entry in self._entries.items()
+            }
+
+
+# Shared by app.py and model.py
+registry = ModelRegistry()
+
+
+def load_model(model_path):
+    """The model in model_path, loaded once per process and hot-swapped when the file changes."""
+    return registry.get(model_path)
+
+
+def model_info():
+    return registry.info()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pin checksums of model artifacts and report their load cost")
+    parser.add_argument('command', choices=['pin', 'info'])
+    parser.add_argument('paths', nargs='+')
+    args = parser.parse_args()
+
+    for path in args.paths:
+        if args.command == 'pin':
+            print(f"{pin_checksum(path)}  {path}")
+        else:
+            load_model(path)
+    if args.command == 'info':
+        print(json.dumps(model_info(), indent=2))
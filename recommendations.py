@@ -0,0 +1,503 @@
+import argparse
+import hashlib
+import json
+import os
+import queue
+import random
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import disease_rules
+from disease_images import index_to_class
+
+CACHE_FILE = 'recommendations.sqlite3'
+TTL_SECONDS = float(os.environ.get('RECOMMENDATION_TTL_HOURS', 24 * 30)) * 3600
+
+# 'gemini' calls the API; 'stub' answers locally so caching and latency can be tested offline
+BACKEND = os.environ.get('RECOMMENDATION_BACKEND', 'gemini')
+STUB_LATENCY_SECONDS = float(os.environ.get('RECOMMENDATION_STUB_LATENCY', 1.5))
+
+# Longest the page waits on the LLM (for streams: for the first chunk, then between chunks)
+# before answering from disease_rules.py instead
+DEADLINE_SECONDS = float(os.environ.get('RECOMMENDATION_DEADLINE', 8))
+# Calls abandoned at the deadline keep a worker until the client gives up on them
+REQUEST_TIMEOUT_SECONDS = 60
+LLM_WORKERS = 8
+
+# Without a key every request is answered by the rule engine (disease_rules.py)
+GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
+GEMINI_MODEL = "gemini-1.5-flash"
+generation_config = {
+    "temperature": 0.7,
+    "top_p": 1,
+    "top_k": 1,
+    "max_output_tokens": 512,
+}
+
+# Bucket widths; the prompt is built from bucketed values, so one cached answer serves the whole bucket
+BUCKETS = {
+    'temperature': 2.0,
+    'humidity': 5.0,
+    'n': 10.0,
+    'p': 10.0,
+    'k': 10.0,
+    'ph': 0.25
+}
+# Rainfall matters on a log scale: dry, drizzle, light, moderate, heavy, very heavy
+RAINFALL_EDGES = [0.5, 2, 5, 10, 20, 50]
+
+# Answer sections the disease page renders, in order; 'other' is text outside any heading
+SECTIONS = {
+    'other': 'Recommendations',
+    'fertilizer': 'Fertilizer Recommendations',
+    'outbreak': 'Outbreak Analysis',
+    'remedies': 'Recommended Remedies'
+}
+# Heading titles as the prompt asks for them, and their usual variants
+_TITLES = {
+    'fertilizer': r'fertili[sz]er(?:\s*(?:/|and|&)\s*manure)?\s+recommendations?',
+    'outbreak': r'outbreak\s+analysis',
+    'remedies': r'(?:recommended\s+)?remedies'
+}
+# Prompt numbering of each section; a numbered heading only needs to start with its keyword
+_NUMBERS = {'1': 'fertilizer', '2': 'outbreak', '3': 'remedies'}
+_KEYWORDS = {'fertilizer': 'fertili', 'outbreak': 'outbreak', 'remedies': 'remed'}
+_MARKUP = r'(?:[ \t]*[*#_]+)*[ \t]*'
+# "1. Fertilizer/Manure Recommendations:", "**2. Outbreak Analysis**" or "## Remedies" on its own line
+_NUMBERED_HEADING = re.compile(
+    rf'^{_MARKUP}(?P<number>[1-3])[.)]{_MARKUP}(?P<title>[^:\n]*?){_MARKUP}(?::{_MARKUP}|$)',
+    re.IGNORECASE | re.MULTILINE
+)
+_TITLE_HEADING = re.compile(
+    rf'^{_MARKUP}(?P<title>' + '|'.join(_TITLES.values()) + rf'){_MARKUP}(?::{_MARKUP}|$)',
+    re.IGNORECASE | re.MULTILINE
+)
+
+
+def _bucket(value, width):
+    return round(round(float(value) / width) * width, 2)
+
+
+def quantize_conditions(soil_type, temperature, rainfall, humidity, n, p, k, ph):
+    """Conditions rounded to their buckets."""
+    rainfall = float(rainfall)
+    upper = next((edge for edge in RAINFALL_EDGES if rainfall < edge), None)
+    lower = max([0] + [edge for edge in RAINFALL_EDGES if edge <= rainfall])
+    return {
+        'soil_type': str(soil_type).strip().lower(),
+        'temperature': _bucket(temperature, BUCKETS['temperature']),
+        'rainfall': f"{lower:g}-{upper:g}" if upper is not None else f"over {lower:g}",
+        'humidity': _bucket(humidity, BUCKETS['humidity']),
+        'n': _bucket(n, BUCKETS['n']),
+        'p': _bucket(p, BUCKETS['p']),
+        'k': _bucket(k, BUCKETS['k']),
+        'ph': _bucket(ph, BUCKETS['ph'])
+    }
+
+
+def build_prompt(disease, conditions):
+    return f"""
+    I have the following details for a crop:
+    - Disease: {disease}
+    - Soil Type: {conditions['soil_type']}
+    - Average Temperature (next 7 days): {conditions['temperature']:g}°C 🌡
+    - Average Rainfall (next 7 days): {conditions['rainfall']} mm 🌧
+    - Average Humidity (next 7 days): {conditions['humidity']:g}% 💧
+    - Soil Nutrient Values: N = {conditions['n']:g}, P = {conditions['p']:g}, K = {conditions['k']:g} 🧪
+    - Soil pH: {conditions['ph']:g}
+
+    Based on these conditions, please provide:
+    1. Fertilizer/Manure Recommendations: on the basis of data provide suggest the exact amount and name of fertilizers or manure to be used.
+    2. Outbreak Analysis: Do the current soil and weather conditions support the disease? What are the chances of the disease spreading?
+    3. Remedies: All possible remedies or treatments to manage or cure the disease.
+    4. do not include /n /** these types of things in the output text.
+    5. give concise and clear answers.
+    6. do not include any unnecessary information.
+    """
+
+
+class GeminiBackend:
+    """Google Gemini, configured on first use."""
+
+    def __init__(self):
+        if not GEMINI_API_KEY:
+            raise RuntimeError("GEMINI_API_KEY is not set")
+        import google.generativeai as genai
+
+        genai.configure(api_key=GEMINI_API_KEY)
+        self.model = genai.GenerativeModel(GEMINI_MODEL, generation_config=generation_config)
+
+    def generate(self, prompt):
+        response = self.model.generate_content(prompt, request_options={'timeout': REQUEST_TIMEOUT_SECONDS})
+        return response.candidates[0].content.parts[0].text
+
+    def stream(self, prompt):
+        for chunk in self.model.generate_content(prompt, stream=True, request_options={'timeout': REQUEST_TIMEOUT_SECONDS}):
+            if chunk.candidates and chunk.candidates[0].content.parts:
+                yield chunk.candidates[0].content.parts[0].text
+
+
+class StubBackend:
+    """Offline stand-in with a fixed latency and answers in Gemini's section layout."""
+
+    def __init__(self, latency_seconds=STUB_LATENCY_SECONDS):
+        self.latency_seconds = latency_seconds
+
+    def generate(self, prompt):
+        return ''.join(self.stream(prompt))
+
+    def stream(self, prompt):
+        """The answer a few words at a time; the first words arrive after a tenth of the latency."""
+        disease = next(
+            (line.split(':', 1)[1].strip() for line in prompt.splitlines() if line.strip().startswith('- Disease:')),
+            'the detected disease'
+        )
+        text = (
+            f"1. Fertilizer/Manure Recommendations: Balanced NPK at label rates for {disease}; stub answer.\n\n"
+            f"2. Outbreak Analysis: Conditions checked against {disease}; stub answer.\n\n"
+            f"3. Remedies: Standard treatment for {disease}; stub answer."
+        )
+        chunks = re.findall(r'\S+\s*', text)
+        time.sleep(self.latency_seconds * 0.1)
+        for chunk in chunks:
+            yield chunk
+            time.sleep(self.latency_seconds * 0.9 / len(chunks))
+
+
+BACKENDS = {
+    'gemini': GeminiBackend,
+    'stub': StubBackend
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name=None):
+    name = name or BACKEND
+    with _backends_lock:
+        if name not in _backends:
+            if name not in BACKENDS:
+                raise ValueError(f"Unknown recommendation backend '{name}'. Choose from {list(BACKENDS)}.")
+            _backends[name] = BACKENDS[name]()
+        return _backends[name]
+
+
+class RecommendationCache:
+    """LLM answers keyed by prompt, with a TTL, in a SQLite file shared by every process."""
+
+    def __init__(self, path=CACHE_FILE, ttl_seconds=TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            # WAL lets readers in other processes proceed while one writes
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS recommendations '
+                '(key TEXT PRIMARY KEY, backend TEXT, disease TEXT, conditions TEXT, text TEXT, created REAL)'
+            )
+            # Which path answered each request
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS answers '
+                '(created REAL, disease TEXT, backend TEXT, source TEXT, reason TEXT, seconds REAL)'
+            )
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT text FROM recommendations WHERE key = ? AND created > ?',
+                (key, time.time() - self.ttl_seconds)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, backend, disease, conditions, text):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO recommendations VALUES (?, ?, ?, ?, ?, ?)',
+                (key, backend, disease, json.dumps(conditions), text, time.time())
+            )
+
+    def record(self, disease, backend, source, reason, seconds):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT INTO answers VALUES (?, ?, ?, ?, ?, ?)',
+                (time.time(), disease, backend, source, reason, seconds)
+            )
+
+    def source_stats(self, since_hours=24):
+        """Requests per answering path over the last since_hours, with mean and worst latency."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT source, COUNT(*), AVG(seconds), MAX(seconds) FROM answers WHERE created > ? GROUP BY source',
+                (time.time() - since_hours * 3600,)
+            ).fetchall()
+        return {
+            source: {'requests': count, 'mean_seconds': round(mean, 3), 'max_seconds': round(worst, 3)}
+            for source, count, mean, worst in rows
+        }
+
+    def purge_expired(self):
+        with self._lock, self._conn:
+            return self._conn.execute(
+                'DELETE FROM recommendations WHERE created <= ?', (time.time() - self.ttl_seconds,)
+            ).rowcount
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM recommendations').fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                'entries': entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = RecommendationCache()
+        return _cache
+
+
+def cache_key(backend, prompt):
+    return hashlib.sha256(f"{backend}\n{GEMINI_MODEL}\n{prompt}".encode()).hexdigest()
+
+
+_llm_pool = ThreadPoolExecutor(max_workers=LLM_WORKERS, thread_name_prefix='llm')
+_STREAM_END = object()
+
+
+def get_recommendations(disease, soil_type, temperature, rainfall, humidity, n, p, k, ph,
+                        backend=None, stream=False, info=None, deadline=DEADLINE_SECONDS):
+    """Recommendation text for a disease under bucketed conditions, from the cache when possible.
+
+    The LLM gets deadline seconds; after that, or if it fails, the answer
+    comes from the rule engine (disease_rules.py). info, if given, is
+    filled with 'source' ('cache', the backend name, 'rules', or
+    '<backend>+rules' for a stream the rules had to finish) and 'reason'.
+
+    With stream=True, returns a generator of text chunks instead; a cached
+    answer comes as one chunk, and a streamed answer is cached once complete.
+    """
+    backend = backend or BACKEND
+    info = {} if info is None else info
+    args = (disease, soil_type, temperature, rainfall, humidity, n, p, k, ph)
+    conditions = quantize_conditions(soil_type, temperature, rainfall, humidity, n, p, k, ph)
+    prompt = build_prompt(disease, conditions)
+    key = cache_key(backend, prompt)
+
+    if stream:
+        return _stream(key, backend, args, conditions, prompt, info, deadline)
+    started = time.perf_counter()
+    cache = get_cache()
+    text = cache.get(key)
+    if text is not None:
+        info.update(source='cache', reason=None)
+    else:
+        future = _llm_pool.submit(lambda: get_backend(backend).generate(prompt))
+        try:
+            text = future.result(timeout=deadline)
+            cache.put(key, backend, disease, conditions, text)
+            info.update(source=backend, reason=None)
+        except TimeoutError:
+            text = disease_rules.recommend(*args)
+            info.update(source='rules', reason=f"no answer within {deadline:g}s")
+        except Exception as e:
+            text = disease_rules.recommend(*args)
+            info.update(source='rules', reason=str(e))
+    cache.record(disease, backend, info['source'], info['reason'], time.perf_counter() - started)
+    return text
+
+
+def _produce(backend, prompt, chunks, cancelled):
+    """Worker: push the backend's chunks onto a queue until done or the reader gives up."""
+    try:
+        for chunk in get_backend(backend).stream(prompt):
+            if cancelled.is_set():
+                return
+            chunks.put(chunk)
+        chunks.put(_STREAM_END)
+    except Exception as e:
+        chunks.put(e)
+
+
+def _stream(key, backend, args, conditions, prompt, info, deadline):
+    started = time.perf_counter()
+    disease = args[0]
+    cache = get_cache()
+    text = cache.get(key)
+    if text is not None:
+        info.update(source='cache', reason=None)
+        cache.record(disease, backend, 'cache', None, time.perf_counter() - started)
+        yield text
+        return
+
+    chunks, cancelled = queue.Queue(), threading.Event()
+    _llm_pool.submit(_produce, backend, prompt, chunks, cancelled)
+    received = []
+    reason = None
+    try:
+        while True:
+            try:
+                chunk = chunks.get(timeout=deadline)
+            except queue.Empty:
+                reason = f"no {'further ' if received else ''}text within {deadline:g}s"
+                break
+            if chunk is _STREAM_END:
+                break
+            if isinstance(chunk, Exception):
+                reason = str(chunk)
+                break
+            received.append(chunk)
+            yield chunk
+    finally:
+        cancelled.set()
+
+    if reason is None:
+        info.update(source=backend, reason=None)
+        cache.put(key, backend, disease, conditions, ''.join(received))
+    elif not received:
+        info.update(source='rules', reason=reason)
+        yield disease_rules.recommend(*args)
+    else:
+        # Keep what the LLM already said and let the rules fill in the missing sections
+        info.update(source=f'{backend}+rules', reason=reason)
+        text = ''.join(received)
+        answered = parse_sections(text)
+        missing = {
+            section: advice for section, advice in disease_rules.recommend_sections(*args).items()
+            if section not in answered
+        }
+        if missing:
+            yield ('' if text.endswith('\n\n') else '\n\n') + disease_rules.format_sections(missing)
+    cache.record(disease, backend, info['source'], info['reason'], time.perf_counter() - started)
+
+
+def _may_be_heading(line):
+    """Whether an unfinished line could still turn into a heading once more text arrives."""
+    if ':' in line:
+        return False
+    words = line.strip(' *#_').lower()
+    if re.match(r'[\s*#_]*[1-3]', line):
+        return True
+    return any(key.startswith(words[:len(key)]) or words.startswith(key) for key in ('fertili', 'outbreak', 'remed', 'recommended'))
+
+
+def _headings(text):
+    """(start, end, section) of each recognised heading, first occurrence per section only."""
+    found = []
+    for match in _NUMBERED_HEADING.finditer(text):
+        section = _NUMBERS[match.group('number')]
+        if match.group('title').strip(' *#_').lower().startswith(_KEYWORDS[section]):
+            found.append((match.start(), match.end(), section))
+    for match in _TITLE_HEADING.finditer(text):
+        title = match.group('title')
+        section = next(key for key, pattern in _TITLES.items() if re.fullmatch(pattern, title, re.IGNORECASE))
+        found.append((match.start(), match.end(), section))
+
+    headings, seen = [], set()
+    for start, end, section in sorted(found):
+        # A repeated title, or one inside a heading already taken, is body text
+        if section in seen or (headings and start < headings[-1][1]):
+            continue
+        seen.add(section)
+        headings.append((start, end, section))
+    return headings
+
+
+def parse_sections(text, final=True):
+    """Split an answer into SECTIONS by heading, {key: body} in order of appearance.
+
+    Only numbered headings ("2. Outbreak Analysis:") and the exact section
+    titles count, so body lines like "Fertilizer timing: ..." stay in their
+    section. Text before the first heading, or the whole answer when it has
+    no headings, is returned under 'other'.
+
+    With final=False the text is a partial stream: a trailing line that
+    could still become a heading is held back, so it never shows up at
+    the end of the previous section.
+    """
+    if not final:
+        line = text.rsplit('\n', 1)[-1]
+        if line.strip() and _may_be_heading(line):
+            text = text[:len(text) - len(line)]
+    headings = _headings(text)
+    sections = {}
+    preamble = text[:headings[0][0] if headings else len(text)].strip()
+    if preamble:
+        sections['other'] = preamble
+    for (_, end, section), following in zip(headings, headings[1:] + [None]):
+        sections[section] = text[end:following[0] if following else len(text)].strip()
+    return sections
+
+
+def simulate(requests=200, farms=20, backend='stub', seed=0, deadline=DEADLINE_SECONDS):
+    """Replay a realistic request mix and report hit rate and latency.
+
+    Each farm has fixed soil readings and a weather forecast that only
+    drifts a little between requests; the disease varies per photo.
+    """
+    rng = random.Random(seed)
+    diseases = list(index_to_class.values())
+    sites = [
+        {
+            'soil_type': rng.choice(['sandy', 'loamy', 'clay']),
+            'weather': (rng.uniform(18, 34), rng.uniform(0, 15), rng.uniform(40, 90)),
+            'nutrients': (rng.uniform(10, 90), rng.uniform(10, 90), rng.uniform(10, 90), rng.uniform(5.5, 7.5))
+        }
+        for _ in range(farms)
+    ]
+    latencies = []
+    for _ in range(requests):
+        site = rng.choice(sites)
+        temperature, rainfall, humidity = (value + rng.gauss(0, 0.3) for value in site['weather'])
+        started = time.perf_counter()
+        get_recommendations(
+            rng.choice(diseases), site['soil_type'],
+            temperature, max(0.0, rainfall), humidity, *site['nutrients'],
+            backend=backend, deadline=deadline
+        )
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return {
+        'requests': requests,
+        'farms': farms,
+        'backend': backend,
+        **get_cache().stats(),
+        'latency_ms_p50': round(latencies[len(latencies) // 2] * 1000, 2),
+        'latency_ms_p95': round(latencies[int(len(latencies) * 0.95)] * 1000, 2),
+        'total_seconds': round(sum(latencies), 2),
+        'sources': get_cache().source_stats()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exercise the recommendation cache offline")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--farms', type=int, default=20)
+    parser.add_argument('--deadline', type=float, default=DEADLINE_SECONDS, help="Seconds before the rule-based fallback answers")
+    parser.add_argument('--backend', default='stub', choices=list(BACKENDS))
+    parser.add_argument('--purge', action='store_true', help="Delete expired entries first")
+    args = parser.parse_args()
+
+    if args.purge:
+        print(f"Purged {get_cache().purge_expired()} expired entries")
+    print(json.dumps(simulate(args.requests, args.farms, args.backend, deadline=args.deadline)))
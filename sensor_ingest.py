@@ -0,0 +1,343 @@
+import argparse
+import glob
+import json
+import logging
+import os
+import socketserver
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from weather_data import append_rows, data_file, load_weather_data, location_slug
+
+SPOOL_DIR = 'sensor_spool'
+STATE_FILE = 'ingest_state.json'
+SOCKET_HOST = '127.0.0.1'
+SOCKET_PORT = 8765
+POLL_SECONDS = 2.0
+
+# A day is closed once readings this far past its end have arrived
+LATENESS = timedelta(hours=2)
+
+# How each reading field becomes the daily history value
+AGGREGATIONS = {
+    'Temperature_C': 'mean',
+    'Humidity_%': 'mean',
+    'Rainfall_mm': 'sum',
+    'Wind_Speed_kmph': 'mean',
+    'Rain_Probability_%': 'mean',
+    'Atmospheric_Pressure_hPa': 'mean',
+    'UV_Index': 'max'
+}
+
+# Short field names sensors may send instead of the CSV column names
+ALIASES = {
+    'temperature': 'Temperature_C',
+    'humidity': 'Humidity_%',
+    'rainfall': 'Rainfall_mm',
+    'wind_speed': 'Wind_Speed_kmph',
+    'rain_probability': 'Rain_Probability_%',
+    'pressure': 'Atmospheric_Pressure_hPa',
+    'uv_index': 'UV_Index'
+}
+
+SEASONS = {
+    12: 'Winter', 1: 'Winter', 2: 'Winter',
+    3: 'Summer', 4: 'Summer', 5: 'Summer', 6: 'Summer',
+    7: 'Monsoon', 8: 'Monsoon', 9: 'Monsoon',
+    10: 'Post-Monsoon', 11: 'Post-Monsoon'
+}
+
+
+class DailyAggregate:
+    """Running count/sum/min/max per metric for one day; each reading is O(1)."""
+
+    def __init__(self, state=None):
+        state = state or {}
+        self.count = state.get('count', {})
+        self.total = state.get('total', {})
+        self.low = state.get('low', {})
+        self.high = state.get('high', {})
+        self.cloud_cover = state.get('cloud_cover')
+
+    def add(self, values, cloud_cover=None):
+        for metric, value in values.items():
+            self.count[metric] = self.count.get(metric, 0) + 1
+            self.total[metric] = self.total.get(metric, 0.0) + value
+            self.low[metric] = min(self.low.get(metric, value), value)
+            self.high[metric] = max(self.high.get(metric, value), value)
+        if cloud_cover:
+            self.cloud_cover = cloud_cover
+
+    def value(self, metric):
+        """Daily value of a metric, or None if no reading had it."""
+        if metric not in self.count:
+            return None
+        how = AGGREGATIONS[metric]
+        if how == 'sum':
+            return self.total[metric]
+        if how == 'max':
+            return self.high[metric]
+        if how == 'min':
+            return self.low[metric]
+        return self.total[metric] / self.count[metric]
+
+    def state(self):
+        return {'count': self.count, 'total': self.total, 'low': self.low, 'high': self.high, 'cloud_cover': self.cloud_cover}
+
+
+class SensorIngestor:
+    """Folds timestamped sensor readings into daily aggregates and appends closed days to the history.
+
+    Readings are JSON objects with an ISO 'timestamp', an optional
+    'location' and any of the AGGREGATIONS fields (or their ALIASES).
+    A day's readings should cover every AGGREGATIONS field between them;
+    the others are written as gaps.
+    Open days survive restarts through STATE_FILE, together with how many
+    readings of each spool file they already hold.
+    """
+
+    def __init__(self, state_path=os.path.join(SPOOL_DIR, STATE_FILE)):
+        self.state_path = state_path
+        self.open_days = {}
+        self.watermark = {}
+        self.last_day = {}
+        # Spool file key -> readings of it already folded into open_days
+        self.progress = {}
+        self.stats = {'readings': 0, 'rejected': 0, 'late': 0, 'incomplete': 0, 'days_appended': 0}
+        self._lock = threading.Lock()
+        self._load_state()
+
+    def add(self, reading, source=None):
+        """Fold one reading into its day and append any days it closes. Returns the appended rows.
+
+        source is (spool file key, reading number) for readings from a spool
+        file; it is saved with the open days so a replayed file skips them.
+        Other readings are saved as soon as they are folded in.
+        """
+        with self._lock:
+            if source:
+                self.progress[source[0]] = source[1]
+            try:
+                timestamp = pd.Timestamp(reading['timestamp'])
+                if timestamp.tzinfo is not None:
+                    timestamp = timestamp.tz_convert(None)
+            except (KeyError, TypeError, ValueError):
+                self.stats['rejected'] += 1
+                return []
+            # Sensors name the location, so only its slug is used in keys and file names
+            location = location_slug(reading.get('location'))
+            values = {}
+            for field, value in reading.items():
+                metric = ALIASES.get(field, field)
+                if metric in AGGREGATIONS and isinstance(value, (int, float)):
+                    values[metric] = float(value)
+            if not values:
+                self.stats['rejected'] += 1
+                return []
+
+            day = timestamp.normalize()
+            if day <= self._last_day(location):
+                # That day is already in the history
+                self.stats['late'] += 1
+                return []
+
+            key = (location, day)
+            if key not in self.open_days:
+                self.open_days[key] = DailyAggregate()
+            self.open_days[key].add(values, reading.get('cloud_cover'))
+            self.stats['readings'] += 1
+            self.watermark[location] = max(self.watermark.get(location, timestamp), timestamp)
+            rows = self._close_days(location)
+            if not rows and source is None:
+                # Nothing replays a socket reading after a restart
+                self._save_state()
+            return rows
+
+    def flush(self, location=None):
+        """Append every open day of a location (or all locations), complete or not."""
+        with self._lock:
+            locations = [location_slug(location)] if location else sorted({loc for loc, _ in self.open_days})
+            rows = []
+            for loc in locations:
+                rows += self._close_days(loc, everything=True)
+            return rows
+
+    def _close_days(self, location, everything=False):
+        closed = sorted(
+            day for loc, day in self.open_days
+            if loc == location and (everything or day + timedelta(days=1) + LATENESS <= self.watermark[location])
+        )
+        if not closed:
+            return []
+        rows = [self._row(location, day, self.open_days[(location, day)]) for day in closed]
+        append_rows(rows, self._file(location))
+        self.last_day[location] = pd.Timestamp(rows[-1]['Date'])
+        self.stats['days_appended'] += len(rows)
+        # Only once the rows are written, so a failed append keeps the days open
+        for day in closed:
+            del self.open_days[(location, day)]
+        self._save_state()
+        return rows
+
+    def _row(self, location, day, aggregate):
+        """History row for a closed day; metrics without readings are left empty for the loaders to interpolate."""
+        row = {'Date': day.strftime('%Y-%m-%d'), 'Season': SEASONS[day.month]}
+        missing = []
+        for metric in AGGREGATIONS:
+            value = aggregate.value(metric)
+            if value is None:
+                missing.append(metric)
+                value = float('nan')
+            row[metric] = value
+        row['Cloud_Cover'] = aggregate.cloud_cover or float('nan')
+        if missing:
+            self.stats['incomplete'] += 1
+            logging.getLogger(__name__).warning(f"{location} {row['Date']} has no readings for {', '.join(missing)}")
+        return row
+
+    def _file(self, location):
+        return data_file(location)
+
+    def _last_day(self, location):
+        if location not in self.last_day:
+            path = self._file(location)
+            if os.path.exists(path):
+                dates = load_weather_data(path).dates
+                self.last_day[location] = pd.Timestamp(dates[-1]) if len(dates) else pd.Timestamp.min
+            else:
+                self.last_day[location] = pd.Timestamp.min
+        return self.last_day[location]
+
+    def _load_state(self):
+        if not os.path.exists(self.state_path):
+            return
+        with open(self.state_path, 'r') as file:
+            state = json.load(file)
+        for item in state.get('open_days', []):
+            self.open_days[(item['location'], pd.Timestamp(item['day']))] = DailyAggregate(item['aggregate'])
+        self.watermark = {location: pd.Timestamp(value) for location, value in state.get('watermark', {}).items()}
+        self.progress = state.get('progress', {})
+
+    def _save_state(self):
+        state = {
+            'open_days': [
+                {'location': location, 'day': str(day.date()), 'aggregate': aggregate.state()}
+                for (location, day), aggregate in self.open_days.items()
+            ],
+            'watermark': {location: value.isoformat() for location, value in self.watermark.items()},
+            'progress': self.progress
+        }
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(state, file)
+        os.replace(tmp_path, self.state_path)
+
+
+def parse_readings(text):
+    """Readings from a JSON object, a JSON list, or JSON lines."""
+    text = text.strip()
+    if not text:
+        return []
+    try:
+        data = json.loads(text)
+        return data if isinstance(data, list) else [data]
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def _spool_key(path):
+    """Identity of one version of a spool file, so a new file reusing the name starts from zero."""
+    stat = os.stat(path)
+    return f"{os.path.basename(path)}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def ingest_spool(ingestor, spool_dir=SPOOL_DIR):
+    """Process every *.json / *.jsonl file in the spool directory, oldest first, then remove it.
+
+    A file interrupted by a crash resumes after the readings the saved state
+    already holds, so none of them is counted twice.
+    """
+    paths = glob.glob(os.path.join(spool_dir, '*.json')) + glob.glob(os.path.join(spool_dir, '*.jsonl'))
+    paths = sorted((path for path in paths if os.path.basename(path) != STATE_FILE), key=os.path.getmtime)
+    keys = {path: _spool_key(path) for path in paths}
+    with ingestor._lock:
+        # Files removed after their last save no longer need their progress
+        ingestor.progress = {key: done for key, done in ingestor.progress.items() if key in keys.values()}
+    appended = []
+    for path in paths:
+        key = keys[path]
+        try:
+            with open(path, 'r') as file:
+                readings = parse_readings(file.read())
+            done = ingestor.progress.get(key, 0)
+            for number, reading in enumerate(readings[done:], done + 1):
+                appended += ingestor.add(reading, source=(key, number))
+            with ingestor._lock:
+                ingestor.progress[key] = len(readings)
+                ingestor._save_state()
+        except Exception as e:
+            # Set the file aside so it does not fail again on every poll and restart
+            logging.getLogger(__name__).warning(f"Moving {path} to {path}.bad: {str(e)}")
+            with ingestor._lock:
+                ingestor.stats['rejected'] += 1
+            os.replace(path, f"{path}.bad")
+            continue
+        os.remove(path)
+    return appended
+
+
+def watch_spool(ingestor, spool_dir=SPOOL_DIR, poll_seconds=POLL_SECONDS):
+    """Poll the spool directory forever."""
+    os.makedirs(spool_dir, exist_ok=True)
+    while True:
+        for row in ingest_spool(ingestor, spool_dir):
+            print(f"Appended {row['Date']}")
+        time.sleep(poll_seconds)
+
+
+class _ReadingHandler(socketserver.StreamRequestHandler):
+    """One JSON reading per line; replies with the number of days appended."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                rows = self.server.ingestor.add(json.loads(line))
+            except json.JSONDecodeError:
+                with self.server.ingestor._lock:
+                    self.server.ingestor.stats['rejected'] += 1
+                rows = []
+            self.wfile.write(f"{len(rows)}\n".encode())
+
+
+def serve_socket(ingestor, host=SOCKET_HOST, port=SOCKET_PORT):
+    """Accept newline-delimited JSON readings on a local TCP socket."""
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    with socketserver.ThreadingTCPServer((host, port), _ReadingHandler) as server:
+        server.daemon_threads = True
+        server.ingestor = ingestor
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream sensor readings into the daily weather history")
+    parser.add_argument('--spool', default=SPOOL_DIR, help="Directory to watch for *.json / *.jsonl reading files")
+    parser.add_argument('--socket', action='store_true', help=f"Also listen on {SOCKET_HOST}:{SOCKET_PORT}")
+    parser.add_argument('--port', type=int, default=SOCKET_PORT)
+    parser.add_argument('--flush', action='store_true', help="Append all open days, complete or not, and exit")
+    args = parser.parse_args()
+
+    ingestor = SensorIngestor(os.path.join(args.spool, STATE_FILE))
+    if args.flush:
+        ingest_spool(ingestor, args.spool)
+        rows = ingestor.flush()
+        print(f"Flushed {len(rows)} day(s) at {datetime.now().isoformat(timespec='seconds')}")
+    else:
+        if args.socket:
+            threading.Thread(target=serve_socket, args=(ingestor, SOCKET_HOST, args.port), daemon=True).start()
+        watch_spool(ingestor, args.spool)
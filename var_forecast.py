@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+from harmonic_forecast import INTERVAL_Z, MONTHLY_ORDER, YEARLY_ORDER, design_matrix
+
+# The correlated weather page series, always fitted together
+JOINT_COLUMNS = [
+    'Temperature_C',
+    'Humidity_%',
+    'Wind_Speed_kmph',
+    'UV_Index',
+    'Atmospheric_Pressure_hPa',
+    'Rain_Probability_%'
+]
+
+LAGS = 2
+
+
+def joint_columns(columns):
+    """JOINT_COLUMNS plus any other requested column, so every fit sees the full system."""
+    return JOINT_COLUMNS + [column for column in columns if column not in JOINT_COLUMNS]
+
+
+class JointForecaster:
+    """Vector autoregression over all weather columns with seasonal exogenous terms.
+
+    Trend and yearly/monthly harmonics are removed from every column in one
+    least-squares solve, then a VAR(LAGS) on the residuals carries the
+    day-to-day interaction between columns (a humid day raising tomorrow's
+    rain probability, and so on). Bands come from the VAR forecast error
+    covariance, so they widen with the horizon.
+    """
+
+    def __init__(self, lags=LAGS, yearly_order=YEARLY_ORDER, monthly_order=MONTHLY_ORDER):
+        self.lags = lags
+        self.yearly_order = yearly_order
+        self.monthly_order = monthly_order
+
+    def fit(self, df, columns=JOINT_COLUMNS):
+        values = df[columns].interpolate().bfill().ffill().to_numpy(dtype=np.float64)
+        self.columns = list(columns)
+        self.start = df.index[0]
+        self.end = df.index[-1]
+
+        X = design_matrix(self._offsets(df.index), self.yearly_order, self.monthly_order)
+        self.seasonal_coef, _, _, _ = np.linalg.lstsq(X, values, rcond=None)
+        residuals = values - X @ self.seasonal_coef
+
+        # Stack lags side by side: row t holds residuals t-1, ..., t-lags
+        p, n = self.lags, len(residuals)
+        Z = np.hstack([residuals[p - i - 1:n - i - 1] for i in range(p)])
+        self.var_coef, _, _, _ = np.linalg.lstsq(Z, residuals[p:], rcond=None)
+        errors = residuals[p:] - Z @ self.var_coef
+        self.error_cov = np.cov(errors, rowvar=False)
+        self.last_residuals = residuals[-p:][::-1]
+        return self
+
+    def predict(self, steps):
+        """Forecast `steps` days past the training data, keyed by column."""
+        k, p = len(self.columns), self.lags
+        ds = pd.date_range(self.end + pd.Timedelta(days=1), periods=steps, freq='D')
+        seasonal = design_matrix(self._offsets(ds), self.yearly_order, self.monthly_order) @ self.seasonal_coef
+
+        # Companion form: the state is the last `lags` residual vectors
+        companion = np.zeros((k * p, k * p))
+        companion[:k] = self.var_coef.T
+        companion[k:, :-k] = np.eye(k * (p - 1))
+        shock = np.zeros((k * p, k * p))
+        shock[:k, :k] = self.error_cov
+
+        state = self.last_residuals.reshape(-1)
+        cov = np.zeros((k * p, k * p))
+        residual_path = np.empty((steps, k))
+        std = np.empty((steps, k))
+        for h in range(steps):
+            state = companion @ state
+            cov = companion @ cov @ companion.T + shock
+            residual_path[h] = state[:k]
+            std[h] = np.sqrt(np.diag(cov)[:k])
+
+        yhat = seasonal + residual_path
+        band = INTERVAL_Z * std
+        return {
+            column: pd.DataFrame({
+                'ds': ds,
+                'yhat': yhat[:, i],
+                'yhat_lower': yhat[:, i] - band[:, i],
+                'yhat_upper': yhat[:, i] + band[:, i]
+            })
+            for i, column in enumerate(self.columns)
+        }
+
+    def _offsets(self, index):
+        return ((index - self.start) / pd.Timedelta(days=1)).to_numpy(dtype=np.float64)
+
+
+def forecast_all(df, columns, steps):
+    """Fit the joint model once and return forecasts for the requested columns."""
+    forecasts = JointForecaster().fit(df, joint_columns(columns)).predict(steps)
+    return {column: forecasts[column] for column in columns}
@@ -0,0 +1,220 @@
+import glob
+import json
+import os
+import re
+import shutil
+
+import numpy as np
+import pandas as pd
+
+DATA_FILE = 'final_dataset.csv'
+CACHE_DIR = 'data_cache'
+# Histories of additional farms, one <location>.csv per farm in the same layout as DATA_FILE
+LOCATIONS_DIR = 'locations'
+DEFAULT_LOCATION = 'default'
+MANIFEST = 'manifest.json'
+# Text columns, read as categories even in a history where they are still empty
+CATEGORICAL_COLUMNS = ['Season', 'Cloud_Cover']
+
+# Loaded datasets keyed by cache directory, so reruns reuse the same mappings
+_loaded = {}
+
+
+class WeatherData:
+    """Memory-mapped columnar copy of the weather CSV."""
+
+    def __init__(self, path, manifest):
+        self.path = path
+        self.manifest = manifest
+        self._frame = None
+        self.dates = np.load(os.path.join(path, 'Date.npy'), mmap_mode='r')
+        self.numeric = {
+            column: np.load(os.path.join(path, f"{_safe(column)}.npy"), mmap_mode='r')
+            for column in manifest['numeric']
+        }
+        self.codes = {
+            column: np.load(os.path.join(path, f"{_safe(column)}.codes.npy"), mmap_mode='r')
+            for column in manifest['categorical']
+        }
+
+    def __len__(self):
+        return len(self.dates)
+
+    def column(self, name):
+        """Read-only float32 view of a numeric column."""
+        return self.numeric[name]
+
+    def categories(self, name):
+        return self.manifest['categorical'][name]
+
+    def frame(self):
+        """Date-indexed DataFrame backed by the mapped arrays."""
+        if self._frame is not None:
+            return self._frame
+        data = dict(self.numeric)
+        for name, codes in self.codes.items():
+            data[name] = pd.Categorical.from_codes(codes, self.categories(name))
+        index = pd.DatetimeIndex(self.dates.astype('datetime64[ns]'), name='Date')
+        frame = pd.DataFrame(data, index=index, copy=False)
+        self._frame = frame[self.manifest['columns']]
+        return self._frame
+
+
+def _safe(column):
+    return column.replace('%', 'pct')
+
+
+def location_slug(location=None):
+    """Filesystem-safe name of a location; None is the main dataset."""
+    if not location:
+        return DEFAULT_LOCATION
+    return re.sub(r'[^A-Za-z0-9_-]+', '_', str(location)).strip('_').lower() or DEFAULT_LOCATION
+
+
+def data_file(location=None):
+    """CSV holding the history of a location."""
+    if location_slug(location) == DEFAULT_LOCATION:
+        return DATA_FILE
+    return os.path.join(LOCATIONS_DIR, f"{location_slug(location)}.csv")
+
+
+def list_locations():
+    """Locations with their own history under LOCATIONS_DIR."""
+    return sorted(
+        os.path.splitext(os.path.basename(path))[0]
+        for path in glob.glob(os.path.join(LOCATIONS_DIR, '*.csv'))
+    )
+
+
+def _stamp(file_path):
+    stat = os.stat(file_path)
+    return f"{stat.st_mtime_ns}_{stat.st_size}"
+
+
+def _write_cache(cache_path, dates, numeric, codes, manifest):
+    """Save the column arrays and manifest, then publish them under cache_path in one rename."""
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    os.makedirs(tmp_path, exist_ok=True)
+    np.save(os.path.join(tmp_path, 'Date.npy'), dates)
+    for column, values in numeric.items():
+        np.save(os.path.join(tmp_path, f"{_safe(column)}.npy"), values)
+    for column, values in codes.items():
+        np.save(os.path.join(tmp_path, f"{_safe(column)}.codes.npy"), values)
+
+    with open(os.path.join(tmp_path, MANIFEST), 'w') as file:
+        json.dump(manifest, file)
+
+    try:
+        os.rename(tmp_path, cache_path)
+    except OSError:
+        # Another process finished the same build first
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+def _drop_stale(base, cache_path):
+    """Delete caches of older CSV versions."""
+    for stale in os.listdir(base):
+        stale_path = os.path.join(base, stale)
+        if stale_path != cache_path and not stale.endswith('.tmp'):
+            shutil.rmtree(stale_path, ignore_errors=True)
+
+
+def build_cache(file_path, cache_path):
+    """Convert the CSV into one .npy file per column."""
+    df = pd.read_csv(file_path, parse_dates=['Date'], dtype={column: str for column in CATEGORICAL_COLUMNS})
+    columns = [column for column in df.columns if column != 'Date']
+
+    manifest = {'source': os.path.abspath(file_path), 'rows': len(df), 'columns': columns, 'numeric': [], 'categorical': {}}
+    numeric, codes = {}, {}
+    for column in columns:
+        if column not in CATEGORICAL_COLUMNS and pd.api.types.is_numeric_dtype(df[column]):
+            numeric[column] = df[column].to_numpy(dtype=np.float32)
+            manifest['numeric'].append(column)
+        else:
+            categorical = df[column].astype('category')
+            codes[column] = categorical.cat.codes.to_numpy(dtype=np.int8)
+            manifest['categorical'][column] = [str(category) for category in categorical.cat.categories]
+
+    _write_cache(cache_path, df['Date'].values.astype('datetime64[D]'), numeric, codes, manifest)
+
+
+def _cache_base(file_path, cache_dir):
+    return os.path.join(cache_dir, os.path.splitext(os.path.basename(file_path))[0])
+
+
+def load_weather_data(file_path=DATA_FILE, cache_dir=CACHE_DIR):
+    """Return the mapped dataset, rebuilding the cache when the CSV has changed."""
+    base = _cache_base(file_path, cache_dir)
+    cache_path = os.path.join(base, _stamp(file_path))
+
+    data = _loaded.get(cache_path)
+    if data is not None:
+        return data
+
+    if not os.path.exists(os.path.join(cache_path, MANIFEST)):
+        os.makedirs(base, exist_ok=True)
+        build_cache(file_path, cache_path)
+        _drop_stale(base, cache_path)
+
+    with open(os.path.join(cache_path, MANIFEST), 'r') as file:
+        manifest = json.load(file)
+    data = WeatherData(cache_path, manifest)
+
+    for path in [path for path in _loaded if path.startswith(base)]:
+        del _loaded[path]
+    _loaded[cache_path] = data
+    return data
+
+
+def append_rows(rows, file_path=DATA_FILE, cache_dir=CACHE_DIR):
+    """Append daily rows (dicts with 'Date' and CSV columns) to a history.
+
+    The column cache is rolled forward from the previous version plus the
+    new rows, so the CSV is not parsed again. Returns the updated dataset.
+    """
+    if not rows:
+        return load_weather_data(file_path, cache_dir)
+    if not os.path.exists(file_path):
+        # A new location starts with the main dataset's header
+        os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+        header = pd.read_csv(DATA_FILE, nrows=0).columns
+        pd.DataFrame(rows, columns=header).to_csv(file_path, index=False, lineterminator='\n')
+        return load_weather_data(file_path, cache_dir)
+
+    data = load_weather_data(file_path, cache_dir)
+    manifest = dict(data.manifest, categorical=dict(data.manifest['categorical']))
+    new = pd.DataFrame(rows, columns=['Date'] + manifest['columns'])
+    new['Date'] = pd.to_datetime(new['Date'])
+
+    with open(file_path, 'a', newline='') as file:
+        file.write(new.assign(Date=new['Date'].dt.strftime('%Y-%m-%d')).to_csv(header=False, index=False, lineterminator='\n'))
+
+    numeric = {
+        column: np.concatenate([data.numeric[column], new[column].to_numpy(dtype=np.float32)])
+        for column in manifest['numeric']
+    }
+    codes = {}
+    for column, categories in manifest['categorical'].items():
+        categories = list(categories)
+        # Missing values get code -1, as when the cache is built from the CSV
+        values = [str(value) if pd.notna(value) else None for value in new[column]]
+        for value in values:
+            if value is not None and value not in categories:
+                categories.append(value)
+        lookup = {category: code for code, category in enumerate(categories)}
+        new_codes = np.array([lookup.get(value, -1) for value in values], dtype=np.int8)
+        codes[column] = np.concatenate([data.codes[column], new_codes])
+        manifest['categorical'][column] = categories
+    dates = np.concatenate([data.dates, new['Date'].values.astype('datetime64[D]')])
+    manifest['rows'] = len(dates)
+
+    base = _cache_base(file_path, cache_dir)
+    cache_path = os.path.join(base, _stamp(file_path))
+    _write_cache(cache_path, dates, numeric, codes, manifest)
+    _drop_stale(base, cache_path)
+    return load_weather_data(file_path, cache_dir)
+
+
+def load_weather_frame(file_path=DATA_FILE):
+    """Date-indexed weather history, the drop-in replacement for read_csv + set_index."""
+    return load_weather_data(file_path).frame()